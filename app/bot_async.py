@@ -55,7 +55,7 @@ else:
 async def _on_shutdown(application: Application):
     del application
     try:
-        runtime.get_storage().flush()
+        runtime.get_storage().close()
     except Exception as exc:
         logger.warning("关闭时刷新订阅存储失败：%s", exc)
     runtime.user_profile_service.flush()
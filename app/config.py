@@ -68,6 +68,12 @@ PARSE_SLOW_THRESHOLD_SECONDS: float = float(os.getenv("PARSE_SLOW_THRESHOLD_SECO
 PARSE_STATS_REPORT_EVERY: int = int(os.getenv("PARSE_STATS_REPORT_EVERY", "50"))
 PARSE_SUCCESS_CACHE_TTL_SECONDS: int = int(os.getenv("PARSE_SUCCESS_CACHE_TTL_SECONDS", "12"))
 PARSE_SUCCESS_CACHE_MAX_SIZE: int = int(os.getenv("PARSE_SUCCESS_CACHE_MAX_SIZE", "512"))
+PARSE_YAML_CACHE_MAX_ENTRIES: int = int(os.getenv("PARSE_YAML_CACHE_MAX_ENTRIES", "256"))
+PARSE_MAX_BODY_BYTES: int = int(os.getenv("PARSE_MAX_BODY_BYTES", str(16 * 1024 * 1024)))
+PARSE_POOL_LIMIT: int = int(os.getenv("PARSE_POOL_LIMIT", "100"))
+PARSE_POOL_LIMIT_PER_HOST: int = int(os.getenv("PARSE_POOL_LIMIT_PER_HOST", "20"))
+SUBSCRIPTION_SAVE_DEBOUNCE_MS: int = int(os.getenv("SUBSCRIPTION_SAVE_DEBOUNCE_MS", "250"))
+SUBSCRIPTION_JOURNAL_ENABLED: bool = _bool("SUBSCRIPTION_JOURNAL_ENABLED", True)
 DETECT_READ_BYTES: int = int(os.getenv("DETECT_READ_BYTES", "8192"))
 
 
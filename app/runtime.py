@@ -1,6 +1,7 @@
 """Runtime container and shared runtime helpers."""
 from __future__ import annotations
 
+import os
 import time
 import secrets
 import logging
@@ -60,14 +61,28 @@ class Runtime:
 
     def get_storage(self):
         if self.storage is None:
-            self.storage = SubscriptionStorage()
+            self.storage = SubscriptionStorage(
+                debounce_ms=config.SUBSCRIPTION_SAVE_DEBOUNCE_MS,
+                journal=config.SUBSCRIPTION_JOURNAL_ENABLED,
+            )
         return self.storage
 
+    def reload_storage(self) -> None:
+        if self.storage is not None:
+            self.storage.reload()
+
     async def get_parser(self):
         if self.shared_session is None:
             import aiohttp
 
-            self.shared_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=100, limit_per_host=20))
+            self.shared_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=config.PARSE_POOL_LIMIT,
+                    limit_per_host=config.PARSE_POOL_LIMIT_PER_HOST,
+                    keepalive_timeout=30,
+                    ttl_dns_cache=300,
+                )
+            )
         if self.parser is None:
             self.parser = SubscriptionParser(
                 proxy_port=self.proxy_port,
@@ -77,6 +92,9 @@ class Runtime:
                 max_parse_concurrency=config.PARSE_GLOBAL_CONCURRENCY,
                 success_cache_ttl_seconds=config.PARSE_SUCCESS_CACHE_TTL_SECONDS,
                 success_cache_max_size=config.PARSE_SUCCESS_CACHE_MAX_SIZE,
+                yaml_cache_dir=os.path.join("data", "yaml_cache"),
+                yaml_cache_max_entries=config.PARSE_YAML_CACHE_MAX_ENTRIES,
+                max_body_bytes=config.PARSE_MAX_BODY_BYTES,
             )
         return self.parser
 
@@ -57,6 +57,7 @@ def create_runtime(*, logger: logging.Logger, proxy_port: int, url_cache_max_siz
         document_service=None,
         subscription_check_service=None,
     )
+    backup_service.reload_storage = runtime.reload_storage
     runtime.admin_service = AdminService(
         get_storage=runtime.get_storage,
         user_manager=runtime.user_manager,
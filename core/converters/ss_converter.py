@@ -16,6 +16,7 @@ import argparse
 import sys
 import binascii
 from core.models import ProxyNode
+from shared.json_codec import json_loads
 
 
 class SSNodeConverter:
@@ -40,8 +41,7 @@ class SSNodeConverter:
             if padding:
                 encoded_part += '=' * (4 - padding)
             
-            decoded = base64.b64decode(encoded_part).decode('utf-8')
-            config = json.loads(decoded)
+            config = json_loads(base64.b64decode(encoded_part))
             
             # 基础信息映射（兼容主流格式）
             node = {
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import base64
+import binascii
 import logging
 import re
 from typing import Dict, List
@@ -10,10 +11,20 @@ from urllib.parse import unquote, urlparse
 import yaml
 
 from core.converters.ss_converter import SSNodeConverter
+from shared.yaml_codec import yaml_safe_load
 
 logger = logging.getLogger(__name__)
 
 TESTABLE_TEXT_PROTOCOLS = {"hysteria", "hysteria2", "tuic"}
+# One scan over the whole text: each match is a stripped node line and its scheme.
+# Longer names come first so "ssr"/"hysteria2" win over "ss"/"hysteria".
+_TEXT_NODE_LINE_RE = re.compile(
+    r"^[^\S\r\n]*((vmess|vless|ssr|ss|trojan|hysteria2|hysteria|tuic)://[^\r\n]*)",
+    re.MULTILINE,
+)
+# Stripped base64 payload, wrapped across lines and optionally padded. Only the body class
+# may match \r/\n before the padding, so a failed match stays linear.
+_BASE64_TEXT_RE = re.compile(r"[A-Za-z0-9+/\r\n]*(?:=[\r\n]*){0,2}")
 
 
 class FileHandler:
@@ -40,33 +51,35 @@ class FileHandler:
             text = content.decode("utf-8")
         except UnicodeDecodeError:
             text = content.decode("gbk", errors="ignore")
+        return FileHandler.parse_txt_text(text)
 
+    @staticmethod
+    def parse_txt_text(text: str, limit: int | None = None) -> List[Dict]:
+        """Parse already-decoded node text, skipping the bytes round-trip of parse_txt_file.
+
+        ``limit`` stops parsing once that many nodes have been collected.
+        """
         if FileHandler._is_base64(text):
             try:
                 text = base64.b64decode(text).decode("utf-8")
-            except Exception:
+            except (ValueError, binascii.Error):
                 pass
 
         converter = SSNodeConverter()
+        line_parsers = {
+            "vmess": converter.parse_vmess_url,
+            "vless": converter.parse_vless_url,
+            "ss": converter.parse_ss_url,
+            "ssr": converter.parse_ssr_url,
+            "trojan": converter.parse_trojan_url,
+        }
         nodes = []
-        for raw_line in text.splitlines():
-            line = raw_line.strip()
-            if not line:
-                continue
-
-            parsed_node = None
-            if line.startswith("vmess://"):
-                parsed_node = converter.parse_vmess_url(line)
-            elif line.startswith("vless://"):
-                parsed_node = converter.parse_vless_url(line)
-            elif line.startswith("ss://"):
-                parsed_node = converter.parse_ss_url(line)
-            elif line.startswith("ssr://"):
-                parsed_node = converter.parse_ssr_url(line)
-            elif line.startswith("trojan://"):
-                parsed_node = converter.parse_trojan_url(line)
-            elif any(line.startswith(f"{protocol}://") for protocol in TESTABLE_TEXT_PROTOCOLS):
-                parsed_node = FileHandler._parse_minimal_text_proxy(line)
+        for match in _TEXT_NODE_LINE_RE.finditer(text):
+            if limit is not None and len(nodes) >= limit:
+                break
+            line = match.group(1).rstrip()
+            line_parser = line_parsers.get(match.group(2), FileHandler._parse_minimal_text_proxy)
+            parsed_node = line_parser(line)
 
             if not parsed_node:
                 continue
@@ -122,7 +135,7 @@ class FileHandler:
     def parse_yaml_file(content: bytes) -> List[Dict]:
         try:
             text = content.decode("utf-8")
-            config = yaml.safe_load(text)
+            config = yaml_safe_load(text)
 
             nodes = []
             if config and "proxies" in config:
@@ -155,14 +168,11 @@ class FileHandler:
 
     @staticmethod
     def _is_base64(text: str) -> bool:
-        text = text.strip()
-        if not text:
-            return False
-        clean_text = text.replace("\n", "").replace("\r", "")
-        if not clean_text:
+        stripped = text.strip()
+        if not _BASE64_TEXT_RE.fullmatch(stripped):
             return False
-        base64_pattern = r"^[A-Za-z0-9+/]*={0,2}$"
-        return len(clean_text) % 4 == 0 and bool(re.match(base64_pattern, clean_text))
+        length = len(stripped) - stripped.count("\n") - stripped.count("\r")
+        return length > 0 and length % 4 == 0
 
     @staticmethod
     def _extract_node_name(line: str, *, fallback: str = "未命名节点") -> str:
@@ -170,7 +180,7 @@ class FileHandler:
             name = line.split("#", 1)[1]
             try:
                 name = unquote(name)
-            except Exception:
+            except ValueError:
                 pass
             name = name.strip()
             if name:
@@ -6,12 +6,16 @@ IP 地理位置查询服务。
 from __future__ import annotations
 
 
+import asyncio
 import atexit
+import ipaddress
 import json
 import logging
 import os
 import time
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
+
+from shared.format_helpers import FLAG_EMOJI_BY_CODE
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +25,9 @@ class GeoLocationService:
 
     _instance = None
     _cache_file = os.path.join("data", "geo_cache.json")
+    _log_file = os.path.join("data", "geo_cache.log")
+    _compact_min_entries = 20
+    _entry_ttl_seconds = 30 * 24 * 3600
 
     def __new__(cls):
         if cls._instance is None:
@@ -33,21 +40,23 @@ class GeoLocationService:
             return
 
         self.api_url = "http://ip-api.com/json/{}"
+        self.batch_api_url = "http://ip-api.com/batch"
+        self.batch_max_size = 100
         self.session = None
 
         os.makedirs(os.path.dirname(self._cache_file), exist_ok=True)
 
         self.cache: Dict[str, Dict] = {}
-        self._cache_dirty = False
-        self._cache_new_entries = 0
-        self._last_cache_save = time.monotonic()
+        self._snapshot_entries = 0
+        self._log_entries = 0
+        self._log_handle = None
         self._load_cache()
 
         atexit.register(lambda: self._maybe_persist_cache(force=True))
         self._initialized = True
 
     def _load_cache(self):
-        """从本地文件加载缓存。"""
+        """加载快照文件，再回放追加日志中尚未压缩的条目。"""
         if os.path.exists(self._cache_file):
             try:
                 with open(self._cache_file, "r", encoding="utf-8") as f:
@@ -56,29 +65,104 @@ class GeoLocationService:
             except Exception as e:
                 logger.error(f"加载 IP 缓存失败: {e}")
                 self.cache = {}
+        self._snapshot_entries = len(self.cache)
+
+        if os.path.exists(self._log_file):
+            try:
+                with open(self._log_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # 进程中断可能留下半行，跳过即可
+                            continue
+                        if isinstance(entry, dict):
+                            self.cache.update(entry)
+                            self._log_entries += 1
+                if self._log_entries:
+                    logger.info(f"已回放 {self._log_entries} 条 IP 缓存增量日志。")
+            except Exception as e:
+                logger.error(f"回放 IP 缓存日志失败: {e}")
+
+        self._expire_stale_entries()
+
+    def _expire_stale_entries(self):
+        """启动时清理超过有效期的条目；旧格式条目没有时间戳，按本次加载时间补齐并立即落盘，之后照常过期。"""
+        now = int(time.time())
+        cutoff = now - self._entry_ttl_seconds
+        stale = []
+        backfilled = 0
+        for ip, location in self.cache.items():
+            if not isinstance(location, dict):
+                stale.append(ip)
+                continue
+            if "ts" not in location:
+                location["ts"] = now
+                backfilled += 1
+            elif location["ts"] < cutoff:
+                stale.append(ip)
+        if not stale and not backfilled:
+            return
+        for ip in stale:
+            del self.cache[ip]
+        if stale:
+            logger.info(f"已清理 {len(stale)} 条过期 IP 缓存。")
+        if backfilled:
+            logger.info(f"已为 {backfilled} 条旧格式 IP 缓存补齐时间戳。")
+        self._compact_cache()
 
     def _save_cache(self):
-        """保存缓存到本地文件。"""
+        """将完整缓存写入快照文件（原子替换）。"""
         try:
-            with open(self._cache_file, "w", encoding="utf-8") as f:
+            temp_file = self._cache_file + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
                 json.dump(self.cache, f, ensure_ascii=False, indent=2)
-                logger.debug(f"已保存 IP 缓存（{len(self.cache)} 条）。")
+            os.replace(temp_file, self._cache_file)
+            logger.debug(f"已保存 IP 缓存（{len(self.cache)} 条）。")
+            return True
         except Exception as e:
             logger.error(f"保存 IP 缓存失败: {e}")
+            return False
+
+    def _append_cache_entry(self, ip: str, location: Dict):
+        """新条目只追加一行到增量日志，写盘成本与缓存总量无关。"""
+        try:
+            if self._log_handle is None:
+                self._log_handle = open(self._log_file, "a", encoding="utf-8", buffering=1)
+            self._log_handle.write(json.dumps({ip: location}, ensure_ascii=False) + "\n")
+            self._log_entries += 1
+        except Exception as e:
+            logger.error(f"追加 IP 缓存日志失败: {e}")
+        self._maybe_persist_cache()
 
     def _maybe_persist_cache(self, force: bool = False):
-        """按批次或时间保存缓存，避免每次查询都写盘。"""
-        if not self._cache_dirty:
+        """日志条目超过快照规模时压缩：重写快照并清空日志。"""
+        if not self._log_entries:
             return
 
-        should_save = force or self._cache_new_entries >= 20 or (time.monotonic() - self._last_cache_save) >= 30
-        if not should_save:
-            return
+        should_compact = force or (
+            self._log_entries >= self._compact_min_entries and self._log_entries > self._snapshot_entries
+        )
+        if should_compact:
+            self._compact_cache()
 
-        self._save_cache()
-        self._cache_dirty = False
-        self._cache_new_entries = 0
-        self._last_cache_save = time.monotonic()
+    def _compact_cache(self):
+        if not self._save_cache():
+            return
+        if self._log_handle is not None:
+            self._log_handle.close()
+            self._log_handle = None
+        try:
+            os.remove(self._log_file)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"清理 IP 缓存日志失败: {e}")
+        self._snapshot_entries = len(self.cache)
+        self._log_entries = 0
 
     async def get_location(self, ip: str) -> Optional[Dict]:
         """
@@ -93,34 +177,22 @@ class GeoLocationService:
         if ip in self.cache:
             return self.cache[ip]
 
-        if self.session is None:
-            import aiohttp
-
-            connector = aiohttp.TCPConnector(limit=5)
-            self.session = aiohttp.ClientSession(connector=connector)
-
+        session = self._ensure_session()
         try:
+            from shared.json_codec import json_loads
             from utils.retry_utils import async_retry_on_failure
 
             @async_retry_on_failure(max_retries=2, initial_delay=0.5)
             async def _fetch():
-                async with self.session.get(self.api_url.format(ip), timeout=5) as resp:
+                async with session.get(self.api_url.format(ip), timeout=5) as resp:
                     resp.raise_for_status()
-                    return await resp.json()
+                    return await resp.json(loads=json_loads)
 
             data = await _fetch()
 
-            if data.get("status") == "success":
-                location = {
-                    "country": data.get("country", "未知"),
-                    "city": data.get("city", "未知"),
-                    "isp": data.get("isp", "未知"),
-                    "country_code": data.get("countryCode", ""),
-                }
-                self.cache[ip] = location
-                self._cache_dirty = True
-                self._cache_new_entries += 1
-                self._maybe_persist_cache()
+            location = self._location_from_response(data)
+            if location:
+                self._store_location(ip, location)
                 return location
 
             logger.warning(f"IP 查询失败: {ip} - {data.get('message')}")
@@ -129,6 +201,94 @@ class GeoLocationService:
             logger.error(f"查询 IP 地理位置失败 {ip}: {e}")
             return None
 
+    async def get_locations_bulk(self, ips: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        批量查询多个地址的地理位置。
+
+        缓存命中直接返回；IP 字面量合并为 ip-api 的 /batch 请求（每批最多 100 个），
+        batch 接口不支持域名，域名仍逐个并发查询。
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        batch_ips = []
+        hostnames = []
+        for ip in dict.fromkeys(ips):
+            if not ip or ip == "unknown":
+                results[ip] = None
+            elif ip in self.cache:
+                results[ip] = self.cache[ip]
+            else:
+                try:
+                    ipaddress.ip_address(ip)
+                    batch_ips.append(ip)
+                except ValueError:
+                    hostnames.append(ip)
+
+        for start in range(0, len(batch_ips), self.batch_max_size):
+            results.update(await self._fetch_batch(batch_ips[start : start + self.batch_max_size]))
+
+        if hostnames:
+            found = await asyncio.gather(*[self.get_location(host) for host in hostnames], return_exceptions=True)
+            for host, location in zip(hostnames, found):
+                results[host] = None if isinstance(location, Exception) else location
+        return results
+
+    async def _fetch_batch(self, ips: list) -> Dict[str, Optional[Dict]]:
+        """通过一次 POST /batch 查询一组 IP。"""
+        results: Dict[str, Optional[Dict]] = {ip: None for ip in ips}
+        session = self._ensure_session()
+        try:
+            from shared.json_codec import json_loads
+            from utils.retry_utils import async_retry_on_failure
+
+            @async_retry_on_failure(max_retries=2, initial_delay=0.5)
+            async def _fetch():
+                async with session.post(self.batch_api_url, json=ips, timeout=10) as resp:
+                    resp.raise_for_status()
+                    return await resp.json(loads=json_loads)
+
+            rows = await _fetch()
+        except Exception as e:
+            logger.error(f"批量查询 IP 地理位置失败（{len(ips)} 个）: {e}")
+            return results
+
+        for row in rows if isinstance(rows, list) else []:
+            if not isinstance(row, dict):
+                continue
+            ip = row.get("query")
+            if ip not in results:
+                continue
+            location = self._location_from_response(row)
+            if location:
+                results[ip] = location
+                self._store_location(ip, location)
+            else:
+                logger.warning(f"IP 查询失败: {ip} - {row.get('message')}")
+        return results
+
+    def _store_location(self, ip: str, location: Dict):
+        location["ts"] = int(time.time())
+        self.cache[ip] = location
+        self._append_cache_entry(ip, location)
+
+    def _ensure_session(self):
+        if self.session is None:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(limit=5)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    @staticmethod
+    def _location_from_response(data: Dict) -> Optional[Dict]:
+        if data.get("status") != "success":
+            return None
+        return {
+            "country": data.get("country", "未知"),
+            "city": data.get("city", "未知"),
+            "isp": data.get("isp", "未知"),
+            "country_code": data.get("countryCode", ""),
+        }
+
     async def close(self):
         """关闭地理位置查询服务的连接池。"""
         if self.session is not None:
@@ -139,6 +299,4 @@ class GeoLocationService:
         """根据国家代码返回旗帜 emoji。"""
         if not country_code or len(country_code) != 2:
             return "🌐"
-
-        code_points = [ord(c) + 127397 for c in country_code.upper()]
-        return "".join(chr(c) for c in code_points)
+        return FLAG_EMOJI_BY_CODE.get(country_code.upper(), "🌐")
@@ -63,6 +63,41 @@ class SubFetchResult(TypedDict):
     nodes: list[tuple[str, str]] # tuple (类别如 'clash'/'raw', 原始行文本)
 
 
+class SubscriptionRecord(TypedDict):
+    """
+    SubscriptionStorage 中单条订阅的持久化结构，
+    以普通 dict 存储并原样交给 Web / Bot 层读取。
+    """
+    name: str
+    url: str
+    added_at: str
+    updated_at: str
+    expire_time: Optional[str]
+    expire_ts: Optional[float]  # expire_time 的 POSIX 时间戳，写入时计算一次
+    node_count: int
+    total: int
+    used: int
+    remaining: int
+    last_check_status: str
+    last_check_error: NotRequired[Optional[str]]
+    owner_uid: int
+    tags: list[str]
+
+
+@dataclass(slots=True)
+class LocationDetail:
+    """
+    节点地区明细（订阅解析 node_stats["locations"] 的条目），
+    解析过程中以紧凑对象流转，仅在结果边界转换为 dict。
+    """
+    name: str
+    country: str
+    city: str = "未知"
+    isp: str = "未知"
+    country_code: str = ""
+    flag: str = "🌐"
+
+
 class SubscriptionStatus(str, Enum):
     ACTIVE = "active"
     WARNING = "warning"
@@ -7,11 +7,13 @@ from __future__ import annotations
 
 import re
 import base64
-import json
+import ipaddress
 import logging
 from typing import Optional
 from urllib.parse import urlparse, unquote
 
+from shared.json_codec import json_loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,8 +21,8 @@ class NodeIPExtractor:
     """节点IP提取器"""
 
     # 预编译正则，避免 is_valid_ip 每次调用都重新编译
-    _IPV4_RE = re.compile(r'^(\d{1,3}\.){3}\d{1,3}$')
-    _DOMAIN_RE = re.compile(r'^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$')
+    _DOMAIN_RE = re.compile(r'\A[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*\Z')
+    _DOMAIN_MAX_LENGTH = 253
     
     @staticmethod
     def extract_ip(node: dict) -> Optional[str]:
@@ -66,9 +68,8 @@ class NodeIPExtractor:
     def _extract_vmess_ip(raw: str) -> Optional[str]:
         """提取VMess协议的IP"""
         try:
-            encoded = raw.replace('vmess://', '').strip()
-            decoded = base64.b64decode(encoded).decode('utf-8')
-            config = json.loads(decoded)
+            encoded = raw[len('vmess://'):].strip()
+            config = json_loads(base64.b64decode(encoded))
             return config.get('add')
         except Exception as e:
             logger.debug(f"VMess IP提取失败: {e}")
@@ -110,7 +111,7 @@ class NodeIPExtractor:
     def _extract_ssr_ip(raw: str) -> Optional[str]:
         """提取SSR协议的IP"""
         try:
-            encoded = raw.replace('ssr://', '').strip()
+            encoded = raw[len('ssr://'):].strip()
             decoded = base64.b64decode(encoded).decode('utf-8')
             # 格式: server:port:protocol:method:obfs:password_base64
             parts = decoded.split(':')
@@ -122,14 +123,22 @@ class NodeIPExtractor:
     
     @staticmethod
     def is_valid_ip(ip: str) -> bool:
-        """验证是否为有效的IP地址或域名（使用预编译正则）"""
+        """验证是否为有效的IP地址（IPv4/IPv6）或域名"""
         if not ip:
             return False
 
-        # IPv4 验证
-        if NodeIPExtractor._IPV4_RE.match(ip):
-            parts = ip.split('.')
-            return all(0 <= int(part) <= 255 for part in parts)
+        # IP 验证交给 ipaddress 的 C 实现，一次完成格式与范围检查
+        try:
+            ipaddress.ip_address(ip)
+            return True
+        except ValueError:
+            pass
+
+        # 纯数字点分串（如 999.1.1.1）不是合法 IP，也不应被当作域名
+        if ip.replace('.', '').isdigit():
+            return False
 
         # 域名验证
+        if len(ip) > NodeIPExtractor._DOMAIN_MAX_LENGTH:
+            return False
         return bool(NodeIPExtractor._DOMAIN_RE.match(ip))
@@ -5,19 +5,86 @@ import asyncio
 import base64
 import binascii
 import copy
+import functools
+import hashlib
 import ipaddress
+import json
+import logging
 import math
+import os
 import re
+import sys
 import time
-from collections import Counter
+from collections import OrderedDict
+from dataclasses import asdict
+from operator import itemgetter
 from datetime import datetime
 from urllib.parse import parse_qs, unquote, unquote_plus, urlparse
 
 import aiohttp
-import yaml
 
 from core import node_extractor as ip_extractor
 from core.file_handler import FileHandler
+from core.models import LocationDetail
+from shared.json_codec import json_loads
+from shared.yaml_codec import YAMLError, yaml_safe_load
+
+logger = logging.getLogger(__name__)
+
+_URLSAFE_BASE64_TABLE = bytes.maketrans(b"-_", b"+/")
+_WHITESPACE_RE = re.compile(r"\s+")
+_BASE64_NOISE_RE = re.compile(r"[^A-Za-z0-9+/=_\-]")
+_BASE64_PEEK_CHARS = 256
+_BASE64_MAX_NOISE_RATIO = 0.08
+_TRAFFIC_KEYS = frozenset(("upload", "download", "total"))
+_HTML_BLOCK_PAGE_WORDS = ("error", "forbidden", "blocked", "firewall", "拦截", "未找到")
+_SHORT_ERROR_BODY_WORDS = ("forbidden", "not found", "error")
+# Domain labels that never name an airport: common TLDs and generic service prefixes.
+_IGNORED_DOMAIN_LABELS = frozenset(
+    ("com", "net", "org", "me", "io", "cc", "top", "xyz", "shop", "info", "site", "link", "cloud", "vip", "best")
+    + ("www", "api", "sub", "cdn")
+)
+# Airport-name detection: candidate cleanup and Content-Disposition filename extraction.
+_CONFIG_FILE_EXT_RE = re.compile(r"\.(yaml|yml|txt|conf)$", re.IGNORECASE)
+_CANDIDATE_WRAPPER_RE = re.compile(r"^[\[\(（【<\s]+|[\]\)）】>\s]+$")
+_MULTI_SPACE_RE = re.compile(r"\s{2,}")
+_FILENAME_STAR_RE = re.compile(r"filename\*\s*=\s*([^;]+)", re.IGNORECASE)
+_FILENAME_RE = re.compile(r"filename=['\"]?(.+?)['\"]?(?:;|$)", re.IGNORECASE)
+_CONTENT_TITLE_RE = re.compile(
+    r"(profile[-_ ]?title|airport[-_ ]?name|subscription[-_ ]?name|name)\s*[:=]\s*(.+)$", re.IGNORECASE
+)
+_VERSION_TOKEN_RE = re.compile(r"v\d+(\.\d+){0,2}")
+_REGION_CODE_TOKEN_RE = re.compile(r"[a-z]{1,2}\d{0,2}")
+_HEX_TOKEN_RE = re.compile(r"[a-f0-9]{8,}")
+_NODE_NAME_PREFIX_RE = re.compile(r"^([^| \-，,.]+)")
+_BRAND_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9_-]{2,}")
+_SHORT_CODE_TOKEN_RE = re.compile(r"[a-z]{1,2}\d*")
+
+_COUNTRY_KEYWORDS = {
+    "香港": ("香港", "HK", "Hong Kong", "Hongkong"),
+    "台湾": ("台湾", "TW", "Taiwan"),
+    "日本": ("日本", "JP", "Japan"),
+    "美国": ("美国", "US", "USA", "America"),
+    "新加坡": ("新加坡", "SG", "Singapore"),
+    "韩国": ("韩国", "KR", "Korea"),
+}
+_COUNTRY_BY_RANK = tuple(_COUNTRY_KEYWORDS)
+_COUNTRY_RANK_BY_KEYWORD = {
+    keyword: rank for rank, keywords in enumerate(_COUNTRY_KEYWORDS.values()) for keyword in keywords
+}
+# Zero-width lookahead so overlapping keywords (e.g. "USG") are all reported.
+_COUNTRY_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _COUNTRY_RANK_BY_KEYWORD)) + "))")
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_expire_timestamp(timestamp: int) -> str:
+    """Format a subscription ``expire`` value; airports resend the same value on every refresh."""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _by_count_desc(counts: dict[str, int]) -> dict[str, int]:
+    """Reorder a tally most-frequent first (ties keep first-seen order), so renderers re-sort in O(n)."""
+    return dict(sorted(counts.items(), key=itemgetter(1), reverse=True))
 
 
 class SubscriptionParser:
@@ -36,6 +103,19 @@ class SubscriptionParser:
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     )
+    # Airport-name detection: scores for node-derived signals and how many node names to sample.
+    NODE_BRAND_SCORE = 85
+    NODE_PREFIX_SCORE = 65
+    AIRPORT_NAME_NODE_SAMPLE = 200
+    BODY_CHUNK_BYTES = 64 * 1024
+    # Bodies larger than this are not kept for If-None-Match / If-Modified-Since replays.
+    CONDITIONAL_CACHE_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+    # Per-response values that a 304 must not resurrect from the cached copy.
+    CONDITIONAL_CACHE_VOLATILE_HEADERS = frozenset({"subscription-userinfo"})
+    # YAML bodies are loaded up to this size; the last few loads are kept so the download probe,
+    # node parsing and name detection share a single yaml_safe_load per body.
+    YAML_LOAD_MAX_CHARS = 300 * 1024
+    YAML_CONFIG_MEMO_SIZE = 4
 
     def __init__(
         self,
@@ -47,11 +127,27 @@ class SubscriptionParser:
         max_parse_concurrency: int = 24,
         success_cache_ttl_seconds: int = 12,
         success_cache_max_size: int = 512,
+        yaml_cache_dir: str | None = None,
+        yaml_cache_max_entries: int = 256,
+        pool_limit: int = 32,
+        pool_limit_per_host: int = 8,
+        max_body_bytes: int = 16 * 1024 * 1024,
+        conditional_cache_max_bytes: int = 32 * 1024 * 1024,
     ):
         self.proxy_port = proxy_port
         self.use_proxy = use_proxy
         self.proxy_url = f"http://127.0.0.1:{proxy_port}" if use_proxy else None
         self.session = session
+        self._owns_session = False
+        self._owned_session_loop: asyncio.AbstractEventLoop | None = None
+        self._pool_limit = max(1, int(pool_limit))
+        self._pool_limit_per_host = max(1, int(pool_limit_per_host))
+        self._request_timeout = aiohttp.ClientTimeout(total=30)
+        self._max_body_bytes = max(1, int(max_body_bytes))
+        self._geo_service = None
+        self._conditional_cache: dict[str, tuple[str, dict[str, str], str, int]] = {}
+        self._conditional_cache_bytes = 0
+        self._conditional_cache_max_bytes = max(0, int(conditional_cache_max_bytes))
         self.verify_ssl = bool(verify_ssl)
         self._parse_semaphore = asyncio.Semaphore(max(1, int(max_parse_concurrency)))
         self._inflight_lock = asyncio.Lock()
@@ -59,6 +155,11 @@ class SubscriptionParser:
         self._success_cache: dict[str, tuple[float, dict]] = {}
         self._success_cache_ttl_seconds = max(0, int(success_cache_ttl_seconds))
         self._success_cache_max_size = max(8, int(success_cache_max_size))
+        self._yaml_cache_dir = yaml_cache_dir
+        self._yaml_cache_max_entries = max(1, int(yaml_cache_max_entries))
+        self._yaml_config_memo: OrderedDict[str, object] = OrderedDict()
+        if self._yaml_cache_dir:
+            os.makedirs(self._yaml_cache_dir, exist_ok=True)
 
     async def parse(self, url, *, force_refresh: bool = False):
         cache_key = str(url).strip()
@@ -143,24 +244,31 @@ class SubscriptionParser:
         from utils.retry_utils import async_retry_on_failure
 
         ua_candidates = list(self._resolve_subscription_user_agents())
-        session_to_use = self.session
-        close_session = False
-        if session_to_use is None:
-            session_to_use = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=10))
-            close_session = True
+        session_to_use = await self._get_session()
 
         async def _request_once(request_headers: dict[str, str]) -> tuple[int, str, dict[str, str]]:
+            user_agent = request_headers.get("User-Agent", "")
+            conditional = self._conditional_cache.get(url)
+            if conditional is not None and conditional[0] != user_agent:
+                conditional = None
+            if conditional is not None:
+                request_headers = {**request_headers, **self._conditional_request_headers(conditional[1])}
             request_kwargs = {
                 "headers": request_headers,
                 "proxy": self.proxy_url,
-                "timeout": aiohttp.ClientTimeout(total=30),
+                "timeout": self._request_timeout,
             }
             if not self.verify_ssl:
                 request_kwargs["ssl"] = False
             async with session_to_use.get(url, **request_kwargs) as response:
-                body = await response.read()
-                text = self._decode_response_body(body, response.charset)
                 lowered_headers = {k.lower(): v for k, v in response.headers.items()}
+                if response.status == 304 and conditional is not None:
+                    # Unchanged body: replay it with the validators; traffic info only ever comes from the 304 itself.
+                    return 200, conditional[2], {**conditional[1], **lowered_headers}
+                body = await self._read_body_limited(response)
+                text = self._decode_response_body(body, response.charset)
+                if response.status == 200:
+                    self._remember_conditional_response(url, user_agent, lowered_headers, text)
                 return response.status, text, lowered_headers
 
         @async_retry_on_failure(max_retries=3, initial_delay=1.0, backoff_factor=2.0)
@@ -212,11 +320,99 @@ class SubscriptionParser:
 
             raise aiohttp.ClientError(f"HTTP {first_http_status or 0}")
 
+        return await _fetch()
+
+    @staticmethod
+    def _conditional_request_headers(headers: dict[str, str]) -> dict[str, str]:
+        conditional_headers = {}
+        if headers.get("etag"):
+            conditional_headers["If-None-Match"] = headers["etag"]
+        if headers.get("last-modified"):
+            conditional_headers["If-Modified-Since"] = headers["last-modified"]
+        return conditional_headers
+
+    def _remember_conditional_response(self, url: str, user_agent: str, headers: dict[str, str], text: str) -> None:
+        """Keep the body of validator-bearing responses so a later 304 can reuse it."""
+        previous = self._conditional_cache.pop(url, None)
+        if previous is not None:
+            self._conditional_cache_bytes -= previous[3]
+        if not (headers.get("etag") or headers.get("last-modified")):
+            return
+        size = sys.getsizeof(text)
+        if size > min(self.CONDITIONAL_CACHE_MAX_ENTRY_BYTES, self._conditional_cache_max_bytes):
+            return
+        kept_headers = {k: v for k, v in headers.items() if k not in self.CONDITIONAL_CACHE_VOLATILE_HEADERS}
+        self._conditional_cache[url] = (user_agent, kept_headers, text, size)
+        self._conditional_cache_bytes += size
+        while self._conditional_cache_bytes > self._conditional_cache_max_bytes:
+            oldest_key = next(iter(self._conditional_cache))
+            self._conditional_cache_bytes -= self._conditional_cache.pop(oldest_key)[3]
+
+    async def _read_body_limited(self, response) -> bytearray:
+        """Stream the response body in chunks, refusing bodies above ``max_body_bytes``."""
+        limit = self._max_body_bytes
+        declared = response.content_length
+        if declared is not None and declared > limit:
+            raise ValueError(f"订阅内容过大: {declared} 字节（上限 {limit}）")
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(self.BODY_CHUNK_BYTES):
+            body += chunk
+            if len(body) > limit:
+                raise ValueError(f"订阅内容过大: 超过 {limit} 字节")
+        return body
+
+    async def _get_session(self):
+        """Return the HTTP session, lazily creating a parser-owned keep-alive session.
+
+        Reusing one session across downloads keeps TCP/TLS connections alive between
+        checks of the same airport instead of handshaking on every call.
+        """
+        if self.session is not None and not self._owns_session:
+            return self.session
+
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self._owned_session_loop is not loop:
+            if self.session is not None:
+                await self._release_stale_session(self.session, self._owned_session_loop)
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_limit,
+                limit_per_host=self._pool_limit_per_host,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+            self._owns_session = True
+            self._owned_session_loop = loop
+        return self.session
+
+    @staticmethod
+    async def _release_stale_session(session, loop: asyncio.AbstractEventLoop | None) -> None:
+        """Close an owned session left behind by a previous event loop."""
+        if session.closed:
+            return
+        if loop is not None and loop.is_running():
+            # Its transports belong to a loop that is still alive; close it there.
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
         try:
-            return await _fetch()
-        finally:
-            if close_session:
-                await session_to_use.close()
+            await session.close()
+        except RuntimeError:
+            # The old loop is stopped but not closed, so its close waiters cannot be awaited here.
+            session.detach()
+
+    async def close(self) -> None:
+        """Close the session if this parser created it; injected sessions belong to the caller."""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+            self._owned_session_loop = None
+
+    async def __aenter__(self) -> SubscriptionParser:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
 
     @staticmethod
     def _should_retry_with_browser_ua(status: int, content: str) -> bool:
@@ -270,7 +466,7 @@ class SubscriptionParser:
             return False
         if self._contains_direct_protocol(normalized):
             return True
-        if self._parse_yaml_nodes(normalized, max_nodes=1) is not None:
+        if self._has_yaml_proxies(normalized):
             return True
         return self._try_decode_subscription_base64(normalized) is not None
 
@@ -287,11 +483,9 @@ class SubscriptionParser:
     def _is_pseudo_200_response(self, content: str, headers: dict) -> bool:
         content_lower = content.lower()
         content_type = headers.get("content-type", "").lower()
-        if "text/html" in content_type and any(
-            word in content_lower for word in ["error", "forbidden", "blocked", "firewall", "拦截", "未找到"]
-        ):
+        if "text/html" in content_type and any(word in content_lower for word in _HTML_BLOCK_PAGE_WORDS):
             return True
-        if 0 < len(content) < 50 and any(word in content_lower for word in ["forbidden", "not found", "error"]):
+        if 0 < len(content) < 50 and any(word in content_lower for word in _SHORT_ERROR_BODY_WORDS):
             return True
         if len(content) > 100 and self._shannon_entropy(content) < 4.25 and re.search(r"<(html|head|body|script|div|a)", content_lower):
             return True
@@ -313,12 +507,12 @@ class SubscriptionParser:
             key, value = part.split("=", 1)
             key = key.strip()
             value = value.strip()
-            if key in {"upload", "download", "total"}:
+            if key in _TRAFFIC_KEYS:
                 traffic_info[key] = int(value)
             elif key == "expire":
                 try:
-                    traffic_info["expire_time"] = datetime.fromtimestamp(int(value)).strftime("%Y-%m-%d %H:%M:%S")
-                except Exception:
+                    traffic_info["expire_time"] = _format_expire_timestamp(int(value))
+                except (ValueError, OSError, OverflowError):
                     pass
 
         if "upload" in traffic_info and "download" in traffic_info:
@@ -334,29 +528,29 @@ class SubscriptionParser:
         parse_notes: list[str] = []
         normalized_original = self._normalize_subscription_text(content)
 
-        yaml_nodes = self._parse_yaml_nodes_preserve_fields(normalized_original, max_nodes=max_nodes)
+        yaml_nodes = self._parse_yaml_nodes_cached(normalized_original, max_nodes=max_nodes)
         if yaml_nodes is not None:
             parse_notes.append("direct-yaml")
             return yaml_nodes, "yaml", list(yaml_nodes), normalized_original, parse_notes
 
         if self._contains_direct_protocol(normalized_original):
             parse_notes.append("direct-protocol")
-            nodes = FileHandler.parse_txt_file(normalized_original.encode("utf-8"))[:max_nodes]
+            nodes = FileHandler.parse_txt_text(normalized_original, limit=max_nodes)
             return nodes, "text", list(nodes), normalized_original, parse_notes
 
         decoded_content = self._try_decode_subscription_base64(normalized_original)
         if decoded_content:
             parse_notes.append("base64-decoded")
-            yaml_nodes = self._parse_yaml_nodes_preserve_fields(decoded_content, max_nodes=max_nodes)
+            yaml_nodes = self._parse_yaml_nodes_cached(decoded_content, max_nodes=max_nodes)
             if yaml_nodes is not None:
                 parse_notes.append("decoded-yaml")
                 return yaml_nodes, "yaml", list(yaml_nodes), decoded_content, parse_notes
 
-            nodes = FileHandler.parse_txt_file(decoded_content.encode("utf-8"))[:max_nodes]
+            nodes = FileHandler.parse_txt_text(decoded_content, limit=max_nodes)
             return nodes, "text", list(nodes), decoded_content, parse_notes
 
         parse_notes.append("unrecognized-content")
-        nodes = FileHandler.parse_txt_file(normalized_original.encode("utf-8"))[:max_nodes]
+        nodes = FileHandler.parse_txt_text(normalized_original, limit=max_nodes)
         return nodes, "text", list(nodes), normalized_original, parse_notes
 
     @staticmethod
@@ -377,8 +571,10 @@ class SubscriptionParser:
         if not self._is_probable_base64(candidate):
             return None
 
+        # The sanitized candidate is pure ASCII; encode it once and let the decoders work on bytes.
+        candidate_bytes = candidate.encode("ascii")
         for decoder in (self._decode_base64_standard, self._decode_base64_urlsafe):
-            decoded = decoder(candidate)
+            decoded = decoder(candidate_bytes)
             if decoded and self._looks_like_subscription_payload(decoded):
                 return self._normalize_subscription_text(decoded)
         return None
@@ -388,17 +584,21 @@ class SubscriptionParser:
         if not content:
             return ""
 
-        compact = re.sub(r"\s+", "", content.replace("\ufeff", "").replace("\x00", ""))
+        # Peek at the head first so HTML/YAML bodies are rejected without scanning the whole payload.
+        head = _WHITESPACE_RE.sub("", content[:_BASE64_PEEK_CHARS])
+        if head and len(_BASE64_NOISE_RE.findall(head)) > len(head) * _BASE64_MAX_NOISE_RATIO:
+            return ""
+
+        compact = _WHITESPACE_RE.sub("", content.replace("\ufeff", "").replace("\x00", ""))
         if not compact:
             return ""
 
-        allowed = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=_-")
-        filtered = "".join(ch for ch in compact if ch in allowed)
+        filtered = _BASE64_NOISE_RE.sub("", compact)
         if not filtered:
             return ""
 
         noise_ratio = 1.0 - (len(filtered) / len(compact))
-        if noise_ratio > 0.08:
+        if noise_ratio > _BASE64_MAX_NOISE_RATIO:
             return ""
         return filtered
 
@@ -407,24 +607,12 @@ class SubscriptionParser:
             return False
         if self._contains_direct_protocol(candidate):
             return False
-        if not re.fullmatch(r"[A-Za-z0-9+/=_-]+", candidate):
-            return False
-
-        padded = candidate + ("=" * ((4 - len(candidate) % 4) % 4))
-        try:
-            base64.b64decode(padded, validate=True)
-            return True
-        except (ValueError, binascii.Error):
-            normalized = padded.replace("-", "+").replace("_", "/")
-            try:
-                base64.b64decode(normalized, validate=True)
-                return True
-            except (ValueError, binascii.Error):
-                return False
+        # Full validation happens in the decoders; a trial decode here would decode the payload twice.
+        return bool(re.fullmatch(r"[A-Za-z0-9+/=_-]+", candidate))
 
     @staticmethod
-    def _decode_base64_standard(candidate: str) -> str | None:
-        padded = candidate + ("=" * ((4 - len(candidate) % 4) % 4))
+    def _decode_base64_standard(candidate: bytes) -> str | None:
+        padded = candidate + (b"=" * ((4 - len(candidate) % 4) % 4))
         try:
             decoded = base64.b64decode(padded, validate=True)
         except (ValueError, binascii.Error):
@@ -432,9 +620,9 @@ class SubscriptionParser:
         return decoded.decode("utf-8-sig", errors="ignore")
 
     @staticmethod
-    def _decode_base64_urlsafe(candidate: str) -> str | None:
-        normalized = candidate.replace("-", "+").replace("_", "/")
-        padded = normalized + ("=" * ((4 - len(normalized) % 4) % 4))
+    def _decode_base64_urlsafe(candidate: bytes) -> str | None:
+        normalized = candidate.translate(_URLSAFE_BASE64_TABLE)
+        padded = normalized + (b"=" * ((4 - len(normalized) % 4) % 4))
         try:
             decoded = base64.b64decode(padded, validate=True)
         except (ValueError, binascii.Error):
@@ -449,12 +637,10 @@ class SubscriptionParser:
             return False
         if self._contains_direct_protocol(normalized):
             return True
-        if self._parse_yaml_nodes(normalized, max_nodes=1) is not None:
-            return True
-        return False
+        return self._has_yaml_proxies(normalized)
 
     @staticmethod
-    def _decode_response_body(body: bytes, charset: str | None) -> str:
+    def _decode_response_body(body: bytes | bytearray, charset: str | None) -> str:
         candidates = []
         if charset:
             candidates.append(charset)
@@ -462,58 +648,101 @@ class SubscriptionParser:
         for encoding in candidates:
             try:
                 return body.decode(encoding)
-            except Exception:
+            except (LookupError, UnicodeDecodeError):
                 continue
         return body.decode("utf-8", errors="ignore")
 
-    @staticmethod
-    def _parse_yaml_nodes(content: str, *, max_nodes: int) -> list[dict] | None:
-        if not (content.strip().startswith("#") or "proxies:" in content[:5000] or "proxy-groups:" in content[:5000]):
-            return None
-
+    def _load_yaml_config(self, content: str):
+        """``yaml_safe_load`` the (truncated) body, or None if it is not valid YAML; memoized per body."""
         yaml_content = content
-        if len(yaml_content) > 300 * 1024:
-            truncate_idx = yaml_content.rfind("\n", 0, 300 * 1024)
-            yaml_content = yaml_content[: truncate_idx if truncate_idx != -1 else 300 * 1024]
-
+        if len(yaml_content) > self.YAML_LOAD_MAX_CHARS:
+            truncate_idx = yaml_content.rfind("\n", 0, self.YAML_LOAD_MAX_CHARS)
+            yaml_content = yaml_content[: truncate_idx if truncate_idx != -1 else self.YAML_LOAD_MAX_CHARS]
+
+        memo = self._yaml_config_memo
+        if yaml_content in memo:
+            memo.move_to_end(yaml_content)
+            return memo[yaml_content]
         try:
-            config = yaml.safe_load(yaml_content)
-        except Exception:
-            return None
+            config = yaml_safe_load(yaml_content)
+        except (YAMLError, ValueError):
+            config = None
+        memo[yaml_content] = config
+        if len(memo) > self.YAML_CONFIG_MEMO_SIZE:
+            memo.popitem(last=False)
+        return config
+
+    def _has_yaml_proxies(self, content: str) -> bool:
+        if not self._looks_like_yaml_config(content):
+            return False
+        config = self._load_yaml_config(content)
+        return isinstance(config, dict) and "proxies" in config
 
-        if not isinstance(config, dict) or "proxies" not in config:
-            return None
+    def _parse_yaml_nodes_cached(self, content: str, *, max_nodes: int) -> list[dict] | None:
+        """Parse Clash YAML nodes, reusing the JSON-compiled node list of identical payloads."""
+        if not self._yaml_cache_dir or not self._looks_like_yaml_config(content):
+            return self._parse_yaml_nodes_preserve_fields(content, max_nodes=max_nodes)
 
-        nodes = []
-        for proxy in config["proxies"]:
-            if len(nodes) >= max_nodes:
-                break
-            if isinstance(proxy, dict):
-                nodes.append(
-                    {
-                        "name": proxy.get("name", "未命名节点"),
-                        "protocol": proxy.get("type", "unknown").lower(),
-                        "server": proxy.get("server", ""),
-                        "port": proxy.get("port", 0),
-                    }
-                )
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        cache_path = os.path.join(self._yaml_cache_dir, f"{digest}-{max_nodes}.json")
+        try:
+            with open(cache_path, "rb") as handle:
+                cached = json_loads(handle.read())
+            if isinstance(cached, list):
+                os.utime(cache_path)
+                return cached
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            logger.debug("Ignoring unreadable YAML node cache entry: %s", cache_path)
+
+        nodes = self._parse_yaml_nodes_preserve_fields(content, max_nodes=max_nodes)
+        if nodes:
+            self._store_yaml_cache_entry(cache_path, nodes)
         return nodes
 
-    @staticmethod
-    def _parse_yaml_nodes_preserve_fields(content: str, *, max_nodes: int) -> list[dict] | None:
-        if not (content.strip().startswith("#") or "proxies:" in content[:5000] or "proxy-groups:" in content[:5000]):
-            return None
+    def _store_yaml_cache_entry(self, cache_path: str, nodes: list[dict]) -> None:
+        try:
+            payload = json.dumps(nodes, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        # Only cache node lists that survive a JSON round-trip unchanged (e.g. no dates or int keys).
+        if json.loads(payload) != nodes:
+            return
+        try:
+            temp_path = cache_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                handle.write(payload)
+            os.replace(temp_path, cache_path)
+            self._evict_yaml_cache()
+        except OSError as exc:
+            logger.debug("Failed to write YAML node cache entry %s: %s", cache_path, exc)
+
+    def _evict_yaml_cache(self) -> None:
+        entries = []
+        with os.scandir(self._yaml_cache_dir) as iterator:
+            for entry in iterator:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    entries.append((entry.stat().st_mtime, entry.path))
+        overflow = len(entries) - self._yaml_cache_max_entries
+        if overflow <= 0:
+            return
+        entries.sort()
+        for _mtime, path in entries[:overflow]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
-        yaml_content = content
-        if len(yaml_content) > 300 * 1024:
-            truncate_idx = yaml_content.rfind("\n", 0, 300 * 1024)
-            yaml_content = yaml_content[: truncate_idx if truncate_idx != -1 else 300 * 1024]
+    @staticmethod
+    def _looks_like_yaml_config(content: str) -> bool:
+        return content.strip().startswith("#") or "proxies:" in content[:5000] or "proxy-groups:" in content[:5000]
 
-        try:
-            config = yaml.safe_load(yaml_content)
-        except Exception:
+    def _parse_yaml_nodes_preserve_fields(self, content: str, *, max_nodes: int) -> list[dict] | None:
+        if not self._looks_like_yaml_config(content):
             return None
 
+        config = self._load_yaml_config(content)
         if not isinstance(config, dict) or "proxies" not in config:
             return None
 
@@ -523,7 +752,8 @@ class SubscriptionParser:
                 break
             if not isinstance(proxy, dict):
                 continue
-            row = dict(proxy)
+            # The loaded config is memoized, so nodes must not share nested values with it.
+            row = copy.deepcopy(proxy)
             ptype = str(row.get("type", row.get("protocol", "unknown")) or "unknown").lower()
             row["type"] = ptype
             row["protocol"] = ptype
@@ -533,46 +763,6 @@ class SubscriptionParser:
             nodes.append(row)
         return nodes
 
-    def _parse_node_line(self, line):
-        protocols = [
-            "vmess://",
-            "vless://",
-            "ss://",
-            "ssr://",
-            "trojan://",
-            "hysteria://",
-            "hysteria2://",
-            "hy2://",
-            "tuic://",
-            "wireguard://",
-        ]
-        for protocol in protocols:
-            if line.startswith(protocol):
-                return {"protocol": protocol.replace("://", ""), "name": self._extract_node_name(line, protocol), "raw": line}
-        return None
-
-    def _extract_node_name(self, line, protocol):
-        if "#" in line:
-            name = line.split("#", 1)[1]
-            try:
-                return unquote(name).strip()
-            except Exception:
-                return name.strip()
-        if protocol == "vmess://":
-            try:
-                import json
-
-                encoded = line.replace("vmess://", "")
-                if len(encoded) % 4:
-                    encoded += "=" * (4 - len(encoded) % 4)
-                decoded = base64.b64decode(encoded).decode("utf-8")
-                config = json.loads(decoded)
-                if "ps" in config:
-                    return config["ps"]
-            except Exception:
-                pass
-        return "未命名节点"
-
     def _extract_airport_name(self, nodes, url, headers=None, content=None):
         bad_keywords = [
             "过期",
@@ -601,7 +791,6 @@ class SubscriptionParser:
             "gemini",
             "deepseek",
         ]
-        common_tlds = ["com", "net", "org", "me", "io", "cc", "top", "xyz", "shop", "info", "site", "link", "cloud", "vip", "best"]
         known_airport_alias = {
             "alberhong": ["alberhong", "alberta", "bobbi", "ndjp"],
             "wcloud": ["wcloud", "w-cloud"],
@@ -640,11 +829,11 @@ class SubscriptionParser:
                 "deepseek",
             }:
                 return True
-            if re.fullmatch(r"v\d+(\.\d+){0,2}", lowered):
+            if _VERSION_TOKEN_RE.fullmatch(lowered):
                 return True
-            if re.fullmatch(r"[a-z]{1,2}\d{0,2}", lowered):
+            if _REGION_CODE_TOKEN_RE.fullmatch(lowered):
                 return True
-            if re.fullmatch(r"[a-f0-9]{8,}", lowered):
+            if _HEX_TOKEN_RE.fullmatch(lowered):
                 return True
             return any(keyword.lower() in lowered for keyword in bad_keywords)
 
@@ -673,7 +862,7 @@ class SubscriptionParser:
                     parts = [
                         part
                         for part in web_host.split(".")
-                        if part and part.lower() not in common_tlds and part.lower() not in {"www", "api", "sub", "cdn"}
+                        if part and part.lower() not in _IGNORED_DOMAIN_LABELS
                     ]
                     if parts:
                         add_candidate(parts[-1], 90)
@@ -682,22 +871,6 @@ class SubscriptionParser:
             for name_candidate, score in self._content_name_candidates(content):
                 add_candidate(name_candidate, score)
 
-        if nodes:
-            brand_name = self._extract_brand_from_nodes(nodes)
-            add_candidate(brand_name, 85)
-
-            prefixes = []
-            for node in nodes:
-                match = re.match(r"^([^| \-，,.]+)", str(node.get("name", "")))
-                if match:
-                    prefix = match.group(1).strip()
-                    if len(prefix) >= 3:
-                        prefixes.append(prefix)
-            if prefixes:
-                most_common = Counter(prefixes).most_common(1)
-                if most_common and most_common[0][1] >= (len(nodes) * 0.35):
-                    add_candidate(most_common[0][0], 65)
-
         parsed = urlparse(url)
         lower_url = url.lower()
         for airport_name, aliases in known_airport_alias.items():
@@ -708,7 +881,7 @@ class SubscriptionParser:
             add_candidate(query_name, 84)
 
         for index, part in enumerate(reversed([part for part in parsed.path.split("/") if part])):
-            clean = re.sub(r"\.(yaml|yml|txt|conf)$", "", part, flags=re.IGNORECASE)
+            clean = _CONFIG_FILE_EXT_RE.sub("", part)
             add_candidate(clean, max(45 - index, 30))
 
         domain = parsed.netloc.split(":")[0]
@@ -718,17 +891,32 @@ class SubscriptionParser:
         except ValueError:
             pass
 
-        domain_parts = [part for part in domain.split(".") if part.lower() not in common_tlds and part.lower() not in ["api", "sub", "www", "cdn"]]
+        domain_parts = [part for part in domain.split(".") if part.lower() not in _IGNORED_DOMAIN_LABELS]
         if domain_parts:
             add_candidate(domain_parts[-1], 35)
 
+        # Node names are the most expensive signal to scan; skip them when the header/content/URL
+        # evidence already leads by more than the node signals could ever add to a rival.
+        if nodes and not self._has_decisive_airport_candidate(candidates):
+            sample = nodes[: self.AIRPORT_NAME_NODE_SAMPLE]
+            brand_name = self._extract_brand_from_nodes(sample)
+            add_candidate(brand_name, self.NODE_BRAND_SCORE)
+
+            prefix_counts: dict[str, int] = {}
+            for node in sample:
+                match = _NODE_NAME_PREFIX_RE.match(str(node.get("name", "")))
+                if match:
+                    prefix = match.group(1).strip()
+                    if len(prefix) >= 3:
+                        prefix_counts[prefix] = prefix_counts.get(prefix, 0) + 1
+            if prefix_counts:
+                # max() keeps the first-seen prefix on ties, like Counter.most_common(1).
+                top_prefix = max(prefix_counts, key=prefix_counts.__getitem__)
+                if prefix_counts[top_prefix] >= (len(sample) * 0.35):
+                    add_candidate(top_prefix, self.NODE_PREFIX_SCORE)
+
         if candidates:
-            score_map: dict[str, dict[str, int]] = {}
-            for score, name in candidates:
-                entry = score_map.setdefault(name, {"total": 0, "max": 0, "hits": 0})
-                entry["total"] += int(score)
-                entry["max"] = max(entry["max"], int(score))
-                entry["hits"] += 1
+            score_map = self._score_airport_candidates(candidates)
             best_name, _stats = max(
                 score_map.items(),
                 key=lambda item: (item[1]["total"], item[1]["max"], item[1]["hits"], len(item[0])),
@@ -737,6 +925,24 @@ class SubscriptionParser:
 
         return "未知机场"
 
+    @staticmethod
+    def _score_airport_candidates(candidates: list[tuple[int, str]]) -> dict[str, dict[str, int]]:
+        score_map: dict[str, dict[str, int]] = {}
+        for score, name in candidates:
+            entry = score_map.setdefault(name, {"total": 0, "max": 0, "hits": 0})
+            entry["total"] += int(score)
+            entry["max"] = max(entry["max"], int(score))
+            entry["hits"] += 1
+        return score_map
+
+    @classmethod
+    def _has_decisive_airport_candidate(cls, candidates: list[tuple[int, str]]) -> bool:
+        if not candidates:
+            return False
+        totals = sorted((entry["total"] for entry in cls._score_airport_candidates(candidates).values()), reverse=True)
+        runner_up = totals[1] if len(totals) > 1 else 0
+        return totals[0] - runner_up > cls.NODE_BRAND_SCORE + cls.NODE_PREFIX_SCORE
+
     @staticmethod
     def _header_name_candidates(headers: dict) -> list[str]:
         keys = [
@@ -773,7 +979,7 @@ class SubscriptionParser:
                 continue
             if stripped.startswith(("#", "//", ";")):
                 body = stripped.lstrip("#/; ").strip()
-                match = re.search(r"(profile[-_ ]?title|airport[-_ ]?name|subscription[-_ ]?name|name)\s*[:=]\s*(.+)$", body, re.IGNORECASE)
+                match = _CONTENT_TITLE_RE.search(body)
                 if match:
                     candidates.append((match.group(2).strip(), 105))
                 elif len(body) >= 2:
@@ -782,15 +988,7 @@ class SubscriptionParser:
             break
 
         if "proxies:" in normalized[:8000] or "proxy-providers:" in normalized[:8000]:
-            yaml_content = normalized
-            if len(yaml_content) > 256 * 1024:
-                truncate_idx = yaml_content.rfind("\n", 0, 256 * 1024)
-                yaml_content = yaml_content[: truncate_idx if truncate_idx != -1 else 256 * 1024]
-            try:
-                config = yaml.safe_load(yaml_content)
-            except Exception:
-                config = None
-
+            config = self._load_yaml_config(normalized)
             if isinstance(config, dict):
                 for key in ("name", "profile-title", "title", "subscription-name", "provider", "provider-name"):
                     value = config.get(key)
@@ -841,15 +1039,15 @@ class SubscriptionParser:
             text = unquote_plus(text).strip()
 
         text = text.replace("\ufeff", "").replace("\x00", "")
-        text = re.sub(r"^[\[\(（【<\s]+|[\]\)）】>\s]+$", "", text)
-        text = re.sub(r"\.(yaml|yml|txt|conf)$", "", text, flags=re.IGNORECASE).strip()
-        text = re.sub(r"\s{2,}", " ", text)
+        text = _CANDIDATE_WRAPPER_RE.sub("", text)
+        text = _CONFIG_FILE_EXT_RE.sub("", text).strip()
+        text = _MULTI_SPACE_RE.sub(" ", text)
         return text
 
     @staticmethod
     def _extract_name_from_content_disposition(content_disposition: str) -> str | None:
         # RFC5987: filename*=UTF-8''TigerCloud.yaml
-        match_star = re.search(r"filename\*\s*=\s*([^;]+)", content_disposition, re.IGNORECASE)
+        match_star = _FILENAME_STAR_RE.search(content_disposition)
         if match_star:
             raw = match_star.group(1).strip().strip('"').strip("'")
             if "''" in raw:
@@ -857,14 +1055,14 @@ class SubscriptionParser:
             else:
                 encoded = raw
             decoded = unquote(encoded).strip()
-            decoded = re.sub(r"\.(yaml|yml|txt|conf)$", "", decoded, flags=re.IGNORECASE).strip()
+            decoded = _CONFIG_FILE_EXT_RE.sub("", decoded).strip()
             if decoded:
                 return decoded
 
-        match_plain = re.search(r"filename=['\"]?(.+?)['\"]?(?:;|$)", content_disposition, re.IGNORECASE)
+        match_plain = _FILENAME_RE.search(content_disposition)
         if match_plain:
             name = unquote(match_plain.group(1)).strip()
-            name = re.sub(r"\.(yaml|yml|txt|conf)$", "", name, flags=re.IGNORECASE).strip()
+            name = _CONFIG_FILE_EXT_RE.sub("", name).strip()
             if name:
                 return name
         return None
@@ -896,22 +1094,23 @@ class SubscriptionParser:
             "gemini",
             "deepseek",
         }
-        counter = Counter()
+        counts: dict[str, int] = {}
         casing: dict[str, str] = {}
 
         for node in nodes:
             name = str(node.get("name") or "")
-            for token in re.findall(r"[A-Za-z][A-Za-z0-9_-]{2,}", name):
+            for token in _BRAND_TOKEN_RE.findall(name):
                 key = token.lower()
-                if key in stop_words or re.fullmatch(r"[a-z]{1,2}\d*", key):
+                if key in stop_words or _SHORT_CODE_TOKEN_RE.fullmatch(key):
                     continue
-                counter[key] += 1
+                counts[key] = counts.get(key, 0) + 1
                 casing.setdefault(key, token)
 
-        if not counter:
+        if not counts:
             return None
 
-        candidate, hits = counter.most_common(1)[0]
+        candidate = max(counts, key=counts.__getitem__)
+        hits = counts[candidate]
         threshold = max(3, int(len(nodes) * 0.2))
         if hits < threshold:
             return None
@@ -953,7 +1152,7 @@ class SubscriptionParser:
         for encoding in ("utf-8", "utf-8-sig", "gb18030"):
             try:
                 decoded = base64.b64decode(padded).decode(encoding, errors="ignore").strip()
-            except Exception:
+            except (ValueError, binascii.Error):
                 continue
             if not decoded:
                 continue
@@ -965,80 +1164,84 @@ class SubscriptionParser:
         return None
 
     async def _analyze_nodes(self, nodes):
-        import asyncio
         from app import config
-        from core.geo_service import GeoLocationService
 
-        protocols = [node.get("protocol", "unknown") for node in nodes]
-        protocol_stats = dict(Counter(protocols))
+        match_country = self._match_country_by_keyword
+        protocol_stats: dict[str, int] = {}
+        countries: dict[str, int] = {}
         if not config.ENABLE_GEO_LOOKUP:
-            countries = [self._match_country_by_keyword(node.get("name", "")) for node in nodes]
-            return {"protocols": protocol_stats, "countries": dict(Counter(countries)), "locations": []}
-
-        geo_client = GeoLocationService()
-        node_ip_pairs = []
+            for node in nodes:
+                protocol = node.get("protocol", "unknown")
+                protocol_stats[protocol] = protocol_stats.get(protocol, 0) + 1
+                country = match_country(node.get("name", ""))
+                countries[country] = countries.get(country, 0) + 1
+            return {"protocols": _by_count_desc(protocol_stats), "countries": _by_count_desc(countries), "locations": []}
+
+        # First pass: protocol counts plus the server addresses of the first MAX_GEO_QUERIES
+        # resolvable nodes; later nodes fall back to keyword matching, so their IPs are not extracted.
+        extract_ip = ip_extractor.NodeIPExtractor.extract_ip
+        is_valid_ip = ip_extractor.NodeIPExtractor.is_valid_ip
+        max_geo_queries = config.MAX_GEO_QUERIES
+        node_ips: list[str | None] = []
+        geo_query_count = 0
         for node in nodes:
-            ip = ip_extractor.NodeIPExtractor.extract_ip(node)
-            node_ip_pairs.append((node, ip if ip and ip_extractor.NodeIPExtractor.is_valid_ip(ip) else None))
+            protocol = node.get("protocol", "unknown")
+            protocol_stats[protocol] = protocol_stats.get(protocol, 0) + 1
+            ip = None
+            if geo_query_count < max_geo_queries:
+                ip = extract_ip(node)
+                if ip and is_valid_ip(ip):
+                    geo_query_count += 1
+                else:
+                    ip = None
+            node_ips.append(ip)
 
-        geo_nodes = [(node, ip) for node, ip in node_ip_pairs if ip is not None][: config.MAX_GEO_QUERIES]
+        geo_client = self._get_geo_service()
         geo_results = {}
-        if geo_nodes:
-            unique_ips = list({ip for _, ip in geo_nodes})
-            results = await asyncio.gather(*[geo_client.get_location(ip) for ip in unique_ips], return_exceptions=True)
-            for ip, result in zip(unique_ips, results):
-                geo_results[ip] = None if isinstance(result, Exception) else result
+        if geo_query_count:
+            geo_results = await geo_client.get_locations_bulk(ip for ip in node_ips if ip is not None)
 
-        countries = []
         locations_detail = []
-        country_detail_count = Counter()
-        geo_query_used = 0
-        for node, ip in node_ip_pairs:
-            country = None
+        country_detail_count: dict[str, int] = {}
+        for node, ip in zip(nodes, node_ips):
+            location = geo_results.get(ip) if ip else None
             detail_obj = None
-            if ip and geo_query_used < config.MAX_GEO_QUERIES:
-                geo_query_used += 1
-                location = geo_results.get(ip)
-                if location:
-                    country = location["country"]
-                    countries.append(country)
-                    if country_detail_count[country] < 3:
-                        detail_obj = {
-                            "name": node.get("name", "未知"),
-                            "country": country,
-                            "city": location["city"],
-                            "isp": location["isp"],
-                            "country_code": location["country_code"],
-                            "flag": geo_client.get_country_flag(location["country_code"]),
-                        }
-            if not country:
-                country = self._match_country_by_keyword(node.get("name", ""))
-                countries.append(country)
-                if country_detail_count[country] < 3:
-                    detail_obj = {
-                        "name": node.get("name", "未知"),
-                        "country": country,
-                        "city": "未知",
-                        "isp": "未知",
-                        "country_code": "",
-                        "flag": "🌐",
-                    }
+            if location:
+                country = location["country"]
+                countries[country] = countries.get(country, 0) + 1
+                if country_detail_count.get(country, 0) < 3:
+                    detail_obj = LocationDetail(
+                        name=node.get("name", "未知"),
+                        country=country,
+                        city=location["city"],
+                        isp=location["isp"],
+                        country_code=location["country_code"],
+                        flag=geo_client.get_country_flag(location["country_code"]),
+                    )
+            else:
+                country = match_country(node.get("name", ""))
+                countries[country] = countries.get(country, 0) + 1
+                if country_detail_count.get(country, 0) < 3:
+                    detail_obj = LocationDetail(name=node.get("name", "未知"), country=country)
             if detail_obj:
                 locations_detail.append(detail_obj)
-                country_detail_count[country] += 1
-        return {"protocols": protocol_stats, "countries": dict(Counter(countries)), "locations": locations_detail}
+                country_detail_count[country] = country_detail_count.get(country, 0) + 1
+        return {
+            "protocols": _by_count_desc(protocol_stats),
+            "countries": _by_count_desc(countries),
+            "locations": [asdict(detail) for detail in locations_detail],
+        }
+
+    def _get_geo_service(self):
+        """Resolve the geo service once per parser; it loads its on-disk cache on first use."""
+        if self._geo_service is None:
+            from core.geo_service import GeoLocationService
+
+            self._geo_service = GeoLocationService()
+        return self._geo_service
 
     def _match_country_by_keyword(self, node_name: str) -> str:
-        country_keywords = {
-            "香港": ["香港", "HK", "Hong Kong", "Hongkong"],
-            "台湾": ["台湾", "TW", "Taiwan"],
-            "日本": ["日本", "JP", "Japan"],
-            "美国": ["美国", "US", "USA", "America"],
-            "新加坡": ["新加坡", "SG", "Singapore"],
-            "韩国": ["韩国", "KR", "Korea"],
-        }
-        for country, keywords in country_keywords.items():
-            if any(keyword in node_name for keyword in keywords):
-                return country
-        return "其他"
+        # Earlier entries in _COUNTRY_KEYWORDS win when a name mentions several regions.
+        ranks = [_COUNTRY_RANK_BY_KEYWORD[match.group(1)] for match in _COUNTRY_KEYWORD_RE.finditer(node_name)]
+        return _COUNTRY_BY_RANK[min(ranks)] if ranks else "其他"
 
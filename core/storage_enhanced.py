@@ -2,17 +2,19 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
 import logging
 import os
 import threading
+import time
+from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime
-from typing import Any, Dict, List
-
-import aiofiles
+from typing import Any, Dict, Iterator, List, Set
 
+from core.models import SubscriptionRecord
 from core.workspace_manager import WorkspaceManager
+from shared.json_codec import iter_object_items, json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -21,28 +23,84 @@ DATA_DIR = ws_manager.db_dir
 DATA_FILE = ws_manager.get_subscription_db_path()
 
 
-class SubscriptionStorage:
-    """Persistent storage for subscriptions."""
+@functools.lru_cache(maxsize=1)
+def _format_local_second(second: int) -> str:
+    return datetime.fromtimestamp(second).isoformat(sep=" ", timespec="seconds")
+
+
+def _now_text() -> str:
+    """Current local time as ``%Y-%m-%d %H:%M:%S``, formatted at most once per second."""
+    return _format_local_second(int(time.time()))
+
+
+def _expire_timestamp(expire_time: Any) -> float | None:
+    """POSIX timestamp for an ``expire_time`` string, or None when absent or unparsable."""
+    if not expire_time or not isinstance(expire_time, str):
+        return None
+    return _parse_expire_timestamp(expire_time)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_expire_timestamp(expire_time: str) -> float | None:
+    # Periodic refreshes resend the same expiry for each subscription.
+    try:
+        return datetime.strptime(expire_time, "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return None
 
-    def __init__(self, data_file: str = DATA_FILE):
+
+class SubscriptionStorage:
+    """Persistent storage for subscriptions.
+
+    The data file is written as compact JSON; ``export_to_file`` produces the indented,
+    human-readable form unless the store is large. With ``journal=True`` single-subscription mutations are appended
+    to ``<data_file>.log`` instead of rewriting the snapshot; the journal is replayed on
+    load and folded back into the snapshot once it outgrows it.
+    """
+
+    JOURNAL_COMPACT_MIN_ENTRIES = 64
+    EXPIRED_COUNT_TTL_SECONDS = 60.0
+    # Fields that change on every refresh without making the record worth rewriting.
+    REFRESH_ONLY_FIELDS = frozenset({"updated_at"})
+    EXPORT_INDENT_MAX_SUBSCRIPTIONS = 1000
+    # Upper bound on how long a steady stream of mutations can postpone a debounced save.
+    SAVE_MAX_DELAY_SECONDS = 5.0
+
+    def __init__(self, data_file: str = DATA_FILE, *, debounce_ms: int = 0, journal: bool = False):
         self.data_file = data_file
+        self.journal_file = data_file + ".log"
         self._lock = threading.Lock()
         self._async_lock = asyncio.Lock()
         self._batch_depth = 0
         self._dirty = False
+        self._debounce_seconds = max(0, int(debounce_ms)) / 1000.0
+        self._save_lock = threading.Lock()
+        self._wake_writer = threading.Event()
+        self._writer: threading.Thread | None = None
+        self._closing = False
+        self._journal_enabled = bool(journal)
+        self._journal_handle = None
+        self._journal_entries = 0
         self._ensure_data_dir()
-        self.subscriptions: Dict[str, Dict[str, Any]] = self._load_data()
+        self.subscriptions: Dict[str, SubscriptionRecord] = self._load_data()
+        self._replay_journal()
+        self._backfill_expire_ts()
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._rebuild_tag_index()
+        self._totals = {"total_traffic": 0, "total_remaining": 0}
+        self._expired_cache: tuple[float, int] | None = None
+        self._rebuild_totals()
 
     def _ensure_data_dir(self) -> None:
         data_dir = os.path.dirname(self.data_file)
         os.makedirs(data_dir, exist_ok=True)
 
-    def _load_data(self) -> Dict[str, Dict[str, Any]]:
+    def _load_data(self) -> Dict[str, SubscriptionRecord]:
         if not os.path.exists(self.data_file):
             return {}
         try:
-            with open(self.data_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(self.data_file, "rb") as f:
+                data = json_loads(f.read())
             if isinstance(data, dict):
                 return data
             logger.warning("Invalid subscriptions data type: %s", type(data).__name__)
@@ -51,44 +109,152 @@ class SubscriptionStorage:
             logger.error("Failed to load subscriptions data: %s", exc)
             return {}
 
+    def _replay_journal(self) -> None:
+        """Apply journaled mutations on top of the loaded snapshot, skipping torn lines."""
+        if not os.path.exists(self.journal_file):
+            return
+        try:
+            with open(self.journal_file, "rb") as f:
+                for line in f:
+                    try:
+                        record = json_loads(line)
+                    except ValueError:
+                        continue
+                    if not isinstance(record, dict) or not record.get("url"):
+                        continue
+                    if record.get("op") == "del":
+                        self.subscriptions.pop(record["url"], None)
+                    elif isinstance(record.get("data"), dict):
+                        self.subscriptions[record["url"]] = record["data"]
+                    else:
+                        continue
+                    self._journal_entries += 1
+        except Exception as exc:
+            logger.error("Failed to replay subscriptions journal: %s", exc)
+        if self._journal_entries:
+            logger.info("Replayed %s journaled subscription changes", self._journal_entries)
+            self._dirty = True
+
+    def _backfill_expire_ts(self) -> None:
+        """Derive ``expire_ts`` for records written before it was stored alongside ``expire_time``."""
+        for data in self.subscriptions.values():
+            if "expire_ts" not in data:
+                data["expire_ts"] = _expire_timestamp(data.get("expire_time"))
+
+    def _rebuild_tag_index(self) -> None:
+        """Recompute the tag -> urls index; callers must hold the lock or own the instance."""
+        index: Dict[str, Set[str]] = {}
+        for url, data in self.subscriptions.items():
+            for tag in data.get("tags", []):
+                index.setdefault(tag, set()).add(url)
+        self._tag_index = index
+
+    def _has_tag(self, url: str, tag: str) -> bool:
+        """O(1) membership through the tag index; the record's ``tags`` list only keeps order."""
+        return url in self._tag_index.get(tag, ())
+
+    def _unindex_tag(self, tag: str, url: str) -> None:
+        urls = self._tag_index.get(tag)
+        if urls is None:
+            return
+        urls.discard(url)
+        if not urls:
+            del self._tag_index[tag]
+
+    def _rebuild_totals(self) -> None:
+        """Recompute the running traffic totals used by ``get_statistics``."""
+        self._totals = {"total_traffic": 0, "total_remaining": 0}
+        for data in self.subscriptions.values():
+            self._account(data, 1)
+
+    def _account(self, data: SubscriptionRecord, sign: int) -> None:
+        """Add (``sign=1``) or retract (``sign=-1``) one subscription from the running totals."""
+        self._totals["total_traffic"] += sign * data.get("total", 0)
+        self._totals["total_remaining"] += sign * data.get("remaining", 0)
+        self._expired_cache = None
+
+    def _append_journal(self, urls: tuple[str, ...]) -> bool:
+        """Append the current state of ``urls`` to the journal; returns False if the write failed."""
+        try:
+            with self._lock:
+                lines = []
+                for url in urls:
+                    data = self.subscriptions.get(url)
+                    if data is None:
+                        lines.append(json_dumps({"op": "del", "url": url}))
+                    else:
+                        lines.append(json_dumps({"op": "set", "url": url, "data": data}))
+                if self._journal_handle is None:
+                    self._journal_handle = open(self.journal_file, "ab")
+                self._journal_handle.write(b"\n".join(lines) + b"\n")
+                self._journal_handle.flush()
+                self._journal_entries += len(lines)
+                should_compact = self._journal_entries >= max(self.JOURNAL_COMPACT_MIN_ENTRIES, len(self.subscriptions))
+        except Exception as exc:
+            logger.error("Failed to append subscriptions journal: %s", exc)
+            return False
+        if should_compact:
+            self._save_data()
+        return True
+
+    def _discard_journal(self, entries_in_snapshot: int) -> None:
+        """Drop the journal after a snapshot save, unless entries were appended meanwhile."""
+        with self._lock:
+            if self._journal_entries != entries_in_snapshot:
+                return
+            if self._journal_handle is not None:
+                self._journal_handle.close()
+                self._journal_handle = None
+            self._journal_entries = 0
+            # Unlink under the lock so a concurrent append cannot reopen the file in between.
+            try:
+                os.remove(self.journal_file)
+            except FileNotFoundError:
+                pass
+            except Exception as exc:
+                logger.error("Failed to remove subscriptions journal: %s", exc)
+
     def _save_data_blocking(self) -> bool:
         """Durable synchronous save with atomic replace."""
         try:
             with self._lock:
                 snapshot = deepcopy(self.subscriptions)
+                journal_entries = self._journal_entries
             temp_file = self.data_file + ".tmp"
-            with open(temp_file, "w", encoding="utf-8") as f:
-                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+            self._write_durable(temp_file, json_dumps(snapshot))
             os.replace(temp_file, self.data_file)
+            self._discard_journal(journal_entries)
             logger.debug("Saved %s subscriptions", len(snapshot))
             return True
         except Exception as exc:
             logger.error("Failed to save subscriptions data: %s", exc)
             return False
 
+    @staticmethod
+    def _write_durable(path: str, payload: bytes) -> None:
+        """Write ``payload`` with raw ``os.write`` calls (normally one) and fsync before returning."""
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
     def _save_data(self) -> bool:
-        saved = self._save_data_blocking()
-        if saved:
+        with self._save_lock:
             with self._lock:
                 self._dirty = False
-        return saved
+            saved = self._save_data_blocking()
+            if not saved:
+                with self._lock:
+                    self._dirty = True
+            return saved
 
     async def _save_data_async(self) -> bool:
-        try:
-            with self._lock:
-                snapshot = deepcopy(self.subscriptions)
-            temp_file = self.data_file + ".tmp"
-            payload = json.dumps(snapshot, indent=2, ensure_ascii=False)
-            async with aiofiles.open(temp_file, "w", encoding="utf-8") as f:
-                await f.write(payload)
-            await asyncio.to_thread(os.replace, temp_file, self.data_file)
-            with self._lock:
-                self._dirty = False
-            logger.debug("Saved %s subscriptions (async)", len(snapshot))
-            return True
-        except Exception as exc:
-            logger.error("Failed to async save subscriptions data: %s", exc)
-            return False
+        """Run the regular save off the event loop so it shares ``_save_lock`` and the dirty bookkeeping."""
+        return await asyncio.to_thread(self._save_data)
 
     async def flush_async(self) -> bool:
         with self._lock:
@@ -97,12 +263,81 @@ class SubscriptionStorage:
         async with self._async_lock:
             return await self._save_data_async()
 
-    def _mark_dirty(self) -> None:
+    def _mark_dirty(self, *urls: str) -> None:
+        """Record a mutation; ``urls`` names the subscriptions it touched, if known."""
         with self._lock:
             self._dirty = True
             should_save_now = self._batch_depth == 0
-        if should_save_now:
+        if not should_save_now:
+            return
+        if self._journal_enabled and urls and self._append_journal(urls):
+            return
+        if self._debounce_seconds > 0:
+            self._schedule_save()
+        else:
+            self._save_data()
+
+    def _schedule_save(self) -> None:
+        """Hand the save to the background writer, or save inline once the store is closing."""
+        with self._lock:
+            closing = self._closing
+            if not closing and self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="subscription-writer", daemon=True
+                )
+                self._writer.start()
+        if closing:
             self._save_data()
+            return
+        self._wake_writer.set()
+
+    def _writer_loop(self) -> None:
+        """Save once mutations have been quiet for the debounce window, or the max delay has passed."""
+        max_delay = max(self.SAVE_MAX_DELAY_SECONDS, self._debounce_seconds)
+        while True:
+            self._wake_writer.wait()
+            self._wake_writer.clear()
+            deadline = time.monotonic() + max_delay
+            while not self._closing:
+                timeout = min(self._debounce_seconds, deadline - time.monotonic())
+                if timeout <= 0 or not self._wake_writer.wait(timeout):
+                    break
+                self._wake_writer.clear()
+            if self._closing:
+                return
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background writer and persist anything still pending."""
+        with self._lock:
+            self._closing = True
+            writer = self._writer
+        if writer is not None:
+            self._wake_writer.set()
+            writer.join()
+        self.flush()
+        with self._lock:
+            if self._journal_handle is not None:
+                self._journal_handle.close()
+                self._journal_handle = None
+
+    def reload(self) -> None:
+        """Re-read the snapshot and journal from disk, dropping in-memory state.
+
+        Used after a backup restore replaced the files underneath this instance; the
+        journal handle is closed so later appends go to the restored file, not the old inode.
+        """
+        with self._save_lock, self._lock:
+            if self._journal_handle is not None:
+                self._journal_handle.close()
+                self._journal_handle = None
+            self._journal_entries = 0
+            self._dirty = False
+            self.subscriptions = self._load_data()
+            self._replay_journal()
+            self._backfill_expire_ts()
+            self._rebuild_tag_index()
+            self._rebuild_totals()
 
     def begin_batch(self) -> None:
         with self._lock:
@@ -116,6 +351,15 @@ class SubscriptionStorage:
         if should_save:
             self._save_data()
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Defer saves until the outermost batch exits, then write once."""
+        self.begin_batch()
+        try:
+            yield
+        finally:
+            self.end_batch(save=True)
+
     def flush(self) -> bool:
         """Force-persist pending data, returns True if flushed."""
         with self._lock:
@@ -124,7 +368,7 @@ class SubscriptionStorage:
         return self._save_data()
 
     def add_or_update(self, url: str, info: Dict[str, Any], user_id: int = 0) -> None:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = _now_text()
         with self._lock:
             existing = self.subscriptions.get(url, {})
             existing_owner = existing.get("owner_uid", 0)
@@ -135,13 +379,13 @@ class SubscriptionStorage:
                 "url": url,
                 "updated_at": now,
                 "expire_time": info.get("expire_time"),
+                "expire_ts": _expire_timestamp(info.get("expire_time")),
                 "node_count": info.get("node_count", 0),
                 "total": info.get("total", 0),
                 "used": info.get("used", 0),
                 "remaining": info.get("remaining", 0),
                 "last_check_status": "success",
                 "owner_uid": owner_uid,
-                "tags": [],
             }
             if url not in self.subscriptions:
                 data["added_at"] = now
@@ -150,22 +394,40 @@ class SubscriptionStorage:
                 data["added_at"] = existing.get("added_at", now)
                 data["tags"] = existing.get("tags", [])
                 data["last_check_error"] = None
+                if self._same_record(existing, data):
+                    existing["updated_at"] = now
+                    logger.debug("Subscription unchanged: %s", data["name"])
+                    return
+                self._account(existing, -1)
 
             self.subscriptions[url] = data
+            self._account(data, 1)
 
-        self._mark_dirty()
+        self._mark_dirty(url)
         logger.info("Saved subscription: %s", data["name"])
 
-    def get_all(self) -> Dict[str, Dict[str, Any]]:
+    def bulk_update(self, items: Dict[str, Dict[str, Any]], user_id: int = 0) -> None:
+        """``add_or_update`` every ``url -> info`` pair, persisting once at the end."""
+        with self.batch():
+            for url, info in items.items():
+                self.add_or_update(url, info, user_id=user_id)
+
+    @classmethod
+    def _same_record(cls, old: SubscriptionRecord, new: SubscriptionRecord) -> bool:
+        if old.keys() != new.keys():
+            return False
+        return all(old[key] == value for key, value in new.items() if key not in cls.REFRESH_ONLY_FIELDS)
+
+    def get_all(self) -> Dict[str, SubscriptionRecord]:
         with self._lock:
             return deepcopy(self.subscriptions)
 
-    def get_by_user(self, user_id: int) -> Dict[str, Dict[str, Any]]:
+    def get_by_user(self, user_id: int) -> Dict[str, SubscriptionRecord]:
         with self._lock:
             return {url: data for url, data in self.subscriptions.items() if data.get("owner_uid", 0) == user_id}
 
-    def get_grouped_by_user(self) -> Dict[int, Dict[str, Dict[str, Any]]]:
-        grouped: Dict[int, Dict[str, Dict[str, Any]]] = {}
+    def get_grouped_by_user(self) -> Dict[int, Dict[str, SubscriptionRecord]]:
+        grouped: Dict[int, Dict[str, SubscriptionRecord]] = {}
         with self._lock:
             for url, data in self.subscriptions.items():
                 uid = data.get("owner_uid", 0)
@@ -184,9 +446,9 @@ class SubscriptionStorage:
             logger.info("Migrated %s subscriptions to owner UID %s", count, default_owner_id)
         return count
 
-    def get_by_tag(self, tag: str) -> Dict[str, Dict[str, Any]]:
+    def get_by_tag(self, tag: str) -> Dict[str, SubscriptionRecord]:
         with self._lock:
-            return {url: data for url, data in self.subscriptions.items() if tag in data.get("tags", [])}
+            return {url: self.subscriptions[url] for url in self._tag_index.get(tag, ())}
 
     def get_user_statistics(self, user_id: int) -> Dict[str, Any]:
         user_subs = self.get_by_user(user_id)
@@ -202,21 +464,24 @@ class SubscriptionStorage:
                     logger.warning("UID %s attempted to delete UID %s subscription", operator_uid, sub_owner)
                     return False
             name = self.subscriptions[url].get("name", "Unknown")
+            for tag in self.subscriptions[url].get("tags", []):
+                self._unindex_tag(tag, url)
+            self._account(self.subscriptions[url], -1)
             del self.subscriptions[url]
-        self._mark_dirty()
+        self._mark_dirty(url)
         logger.info("Deleted subscription: %s", name)
         return True
 
     def mark_check_failed(self, url: str, error: str, operator_uid: int = 0, require_owner: bool = False) -> bool:
         if not self._can_modify_subscription(url, operator_uid, require_owner):
             return False
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = _now_text()
         with self._lock:
             data = self.subscriptions[url]
             data["last_check_status"] = "failed"
             data["last_check_error"] = str(error)[:500]
             data["updated_at"] = now
-        self._mark_dirty()
+        self._mark_dirty(url)
         return True
 
     def _can_modify_subscription(self, url: str, operator_uid: int = 0, require_owner: bool = False) -> bool:
@@ -235,14 +500,13 @@ class SubscriptionStorage:
         if not self._can_modify_subscription(url, operator_uid, require_owner):
             return False
         with self._lock:
-            tags = self.subscriptions[url].get("tags", [])
-            if tag in tags:
+            if self._has_tag(url, tag):
                 logger.info("Tag already exists: %s", tag)
                 return False
-            tags.append(tag)
-            self.subscriptions[url]["tags"] = tags
+            self.subscriptions[url].setdefault("tags", []).append(tag)
+            self._tag_index.setdefault(tag, set()).add(url)
             name = self.subscriptions[url].get("name", "Unknown")
-        self._mark_dirty()
+        self._mark_dirty(url)
         logger.info("Added tag %s to %s", tag, name)
         return True
 
@@ -250,35 +514,51 @@ class SubscriptionStorage:
         if not self._can_modify_subscription(url, operator_uid, require_owner):
             return False
         with self._lock:
-            tags = self.subscriptions[url].get("tags", [])
-            if tag not in tags:
+            if not self._has_tag(url, tag):
                 return False
-            tags.remove(tag)
-            self.subscriptions[url]["tags"] = tags
-        self._mark_dirty()
+            data = self.subscriptions[url]
+            data["tags"] = [existing for existing in data.get("tags", []) if existing != tag]
+            self._unindex_tag(tag, url)
+        self._mark_dirty(url)
         logger.info("Removed tag: %s", tag)
         return True
 
     def get_all_tags(self) -> List[str]:
-        all_tags = set()
         with self._lock:
-            for data in self.subscriptions.values():
-                all_tags.update(data.get("tags", []))
-        return sorted(all_tags)
+            return sorted(self._tag_index)
+
+    def export_to_file(self, filepath: str, indent: bool | None = None) -> bool:
+        """Write an export one subscription at a time.
 
-    def export_to_file(self, filepath: str) -> bool:
+        The output is byte-for-byte what dumping the whole export dict with ``json_dumps``
+        would give, but only one serialized record is held in memory at once. ``indent``
+        defaults to pretty-printing only up to ``EXPORT_INDENT_MAX_SUBSCRIPTIONS`` records.
+        """
         try:
             with self._lock:
-                snapshot = deepcopy(self.subscriptions)
-            export_data = {
-                "version": "1.0",
-                "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "count": len(snapshot),
-                "subscriptions": snapshot,
-            }
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
-            logger.info("Exported %s subscriptions to %s", len(snapshot), filepath)
+                items = list(self.subscriptions.items())
+            if indent is None:
+                indent = len(items) <= self.EXPORT_INDENT_MAX_SUBSCRIPTIONS
+            header = json_dumps({"version": "1.0", "exported_at": _now_text(), "count": len(items)}, indent=indent)
+            with open(filepath, "wb") as f:
+                if indent:
+                    f.write(header[: -len(b"\n}")] + b',\n  "subscriptions": {')
+                else:
+                    f.write(header[:-1] + b',"subscriptions":{')
+                for index, (url, data) in enumerate(items):
+                    with self._lock:
+                        entry = json_dumps(data, indent=indent)
+                    f.write(b"," if index else b"")
+                    if indent:
+                        # JSON strings never contain raw newlines, so this only re-indents structure.
+                        f.write(b"\n    " + json_dumps(url) + b": " + entry.replace(b"\n", b"\n    "))
+                    else:
+                        f.write(json_dumps(url) + b":" + entry)
+                if indent:
+                    f.write(b"\n  }\n}" if items else b"}\n}")
+                else:
+                    f.write(b"}}")
+            logger.info("Exported %s subscriptions to %s", len(items), filepath)
             return True
         except Exception as exc:
             logger.error("Export failed: %s", exc)
@@ -286,15 +566,12 @@ class SubscriptionStorage:
 
     def import_from_file(self, filepath: str, merge: bool = True) -> int:
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                import_data = json.load(f)
-            if "subscriptions" not in import_data:
-                logger.error("Invalid import file: missing 'subscriptions'")
-                return 0
-
-            imported_subs = import_data["subscriptions"]
-            if not isinstance(imported_subs, dict):
-                logger.error("Invalid subscriptions payload in import file")
+            with open(filepath, "rb") as f:
+                imported_subs = {
+                    url: data for url, data in iter_object_items(f, "subscriptions") if isinstance(data, dict)
+                }
+            if not imported_subs:
+                logger.error("Invalid import file: no subscriptions found")
                 return 0
 
             count = 0
@@ -304,6 +581,9 @@ class SubscriptionStorage:
                 for url, data in imported_subs.items():
                     self.subscriptions[url] = data
                     count += 1
+                self._backfill_expire_ts()
+                self._rebuild_tag_index()
+                self._rebuild_totals()
             self._mark_dirty()
             logger.info("Imported %s subscriptions", count)
             return count
@@ -312,27 +592,42 @@ class SubscriptionStorage:
             return 0
 
     def get_statistics(self) -> Dict[str, Any]:
+        """Store-wide statistics from the running totals; the expired count is cached briefly."""
         with self._lock:
-            snapshot = deepcopy(self.subscriptions)
-        return self._calc_statistics(snapshot)
+            total = len(self.subscriptions)
+            now = time.monotonic()
+            if self._expired_cache is not None and now - self._expired_cache[0] <= self.EXPIRED_COUNT_TTL_SECONDS:
+                expired = self._expired_cache[1]
+            else:
+                expired = self._count_expired(self.subscriptions)
+                self._expired_cache = (now, expired)
+            return {
+                "total": total,
+                "expired": expired,
+                "active": total - expired,
+                "total_traffic": self._totals["total_traffic"],
+                "total_remaining": self._totals["total_remaining"],
+                "tags": sorted(self._tag_index),
+            }
 
-    def _calc_statistics(self, subs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-        total = len(subs)
+    @staticmethod
+    def _count_expired(subs: Dict[str, SubscriptionRecord]) -> int:
         expired = 0
+        now_ts = time.time()
+        for data in subs.values():
+            ts = data.get("expire_ts")
+            if ts is not None and ts < now_ts:
+                expired += 1
+        return expired
+
+    def _calc_statistics(self, subs: Dict[str, SubscriptionRecord]) -> Dict[str, Any]:
+        total = len(subs)
+        expired = self._count_expired(subs)
         total_traffic = 0
         total_remaining = 0
         tags = set()
-        now = datetime.now()
 
         for data in subs.values():
-            expire_time_str = data.get("expire_time")
-            if expire_time_str:
-                try:
-                    expire_date = datetime.strptime(expire_time_str, "%Y-%m-%d %H:%M:%S")
-                    if expire_date < now:
-                        expired += 1
-                except Exception:
-                    pass
             total_traffic += data.get("total", 0)
             total_remaining += data.get("remaining", 0)
             tags.update(data.get("tags", []))
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import html
 from datetime import datetime
+from operator import itemgetter
 
 from shared.format_helpers import (
     create_progress_bar,
@@ -12,6 +13,7 @@ from shared.format_helpers import (
 )
 
 MAX_TELEGRAM_TEXT = 3900
+_BY_COUNT = itemgetter(1)
 
 
 def _format_skipped_protocols(quick_check: dict) -> str:
@@ -114,7 +116,7 @@ def _build_protocol_summary(info: dict, *, top_n: int = 4) -> str:
         return ""
     parts = [
         f"{html.escape(str(protocol).upper())} {count}"
-        for protocol, count in sorted(protocols.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        for protocol, count in sorted(protocols.items(), key=_BY_COUNT, reverse=True)[:top_n]
     ]
     return " / ".join(parts)
 
@@ -126,7 +128,7 @@ def _build_country_summary(info: dict, *, top_n: int = 4) -> str:
         return ""
     parts = [
         f"{get_country_flag(country)}{html.escape(country)} {count}"
-        for country, count in sorted(countries.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        for country, count in sorted(countries.items(), key=_BY_COUNT, reverse=True)[:top_n]
     ]
     return " / ".join(parts)
 
@@ -143,7 +145,8 @@ def _render_node_lines(info: dict, *, max_items: int, char_budget: int) -> tuple
             break
         protocol = str(node.get("protocol") or node.get("type") or "unknown").upper()
         name = str(node.get("name") or f"node-{index}")
-        line = f"{index}. [{html.escape(protocol)}] {html.escape(name)}"
+        # The line carries no markup of its own, so one escape pass covers both fields.
+        line = html.escape(f"{index}. [{protocol}] {name}")
         if len(line) + 1 > remaining_budget:
             break
         lines.append(line)
@@ -244,16 +247,14 @@ def format_subscription_info(info, url=None):
     if remain_text:
         summary_lines.append(f"<b>剩余时间：</b> {html.escape(remain_text)}")
 
-    summary_block = "<blockquote>\n" + "\n".join(summary_lines) + "\n</blockquote>"
-    details = _build_details(info, node_limit=100, node_char_budget=1800)
-    message = "\n".join(header_lines) + "\n\n" + summary_block + ("\n\n" + details if details else "")
-
-    if len(message) > MAX_TELEGRAM_TEXT:
-        details = _build_details(info, node_limit=40, node_char_budget=1000)
-        message = "\n".join(header_lines) + "\n\n" + summary_block + ("\n\n" + details if details else "")
-    if len(message) > MAX_TELEGRAM_TEXT:
-        details = _build_details(info, node_limit=20, node_char_budget=650)
-        message = "\n".join(header_lines) + "\n\n" + summary_block + ("\n\n" + details if details else "")
+    # Header and summary are fixed; only the collapsible details shrink when over the limit.
+    head = "\n".join([*header_lines, "", "<blockquote>", *summary_lines, "</blockquote>"])
+    message = head
+    for node_limit, node_char_budget in ((100, 1800), (40, 1000), (20, 650)):
+        details = _build_details(info, node_limit=node_limit, node_char_budget=node_char_budget)
+        message = "\n\n".join((head, details)) if details else head
+        if len(message) <= MAX_TELEGRAM_TEXT:
+            break
 
     return message[:MAX_TELEGRAM_TEXT]
 
@@ -304,13 +305,13 @@ def format_node_analysis_compact(info, url=None):
     stats = info.get("node_stats") or {}
     countries = stats.get("countries") or {}
     if countries:
-        top_countries = sorted(countries.items(), key=lambda item: item[1], reverse=True)[:3]
+        top_countries = sorted(countries.items(), key=_BY_COUNT, reverse=True)[:3]
         country_text = " / ".join(f"{html.escape(str(country))} {count}" for country, count in top_countries)
         lines.append(f"<b>地区：</b> {country_text}")
 
     protocols = stats.get("protocols") or {}
     if protocols:
-        top_protocols = sorted(protocols.items(), key=lambda item: item[1], reverse=True)[:3]
+        top_protocols = sorted(protocols.items(), key=_BY_COUNT, reverse=True)[:3]
         protocol_text = " / ".join(f"{html.escape(str(protocol).upper())} {count}" for protocol, count in top_protocols)
         lines.append(f"<b>协议：</b> {protocol_text}")
 
@@ -7,6 +7,7 @@ import os
 import shutil
 import zipfile
 from datetime import datetime
+from typing import Callable
 
 from core.json_store import JsonStore
 
@@ -15,9 +16,17 @@ logger = logging.getLogger(__name__)
 
 
 class BackupService:
-    def __init__(self, *, base_dir: str = "data", max_restore_total_bytes: int = 200 * 1024 * 1024):
+    def __init__(
+        self,
+        *,
+        base_dir: str = "data",
+        max_restore_total_bytes: int = 200 * 1024 * 1024,
+        reload_storage: Callable[[], None] | None = None,
+    ):
         self.base_dir = base_dir
         self.max_restore_total_bytes = max_restore_total_bytes
+        # Lets the live SubscriptionStorage drop its journal handle and re-read restored files.
+        self.reload_storage = reload_storage
         self.db_dir = os.path.join(base_dir, "db")
         self.logs_dir = os.path.join(base_dir, "logs")
         self.cache_dir = os.path.join(base_dir, "cache_exports")
@@ -29,6 +38,7 @@ class BackupService:
     def _core_files(self) -> list[str]:
         return [
             os.path.join(self.db_dir, "subscriptions.json"),
+            self._subscription_journal_path(),
             os.path.join(self.db_dir, "users.json"),
             os.path.join(self.db_dir, "access_state.json"),
             os.path.join(self.db_dir, "user_profiles.json"),
@@ -36,6 +46,9 @@ class BackupService:
             os.path.join(self.db_dir, "export_cache_index.json"),
         ]
 
+    def _subscription_journal_path(self) -> str:
+        return os.path.join(self.db_dir, "subscriptions.json.log")
+
     def create_backup(self) -> tuple[str, str]:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         zip_path = os.path.join(self.backups_dir, f"backup_{timestamp}.zip")
@@ -108,6 +121,15 @@ class BackupService:
                 with archive.open(info) as src, open(target_path, "wb") as dst:
                     shutil.copyfileobj(src, dst)
                 restored.append(normalized)
+
+        # A journal left over from the previous state would be replayed on top of the restored snapshot.
+        restored_paths = {os.path.abspath(target_path) for _, target_path, _ in safe_members}
+        journal_path = os.path.abspath(self._subscription_journal_path())
+        subscriptions_path = os.path.abspath(os.path.join(self.db_dir, "subscriptions.json"))
+        if subscriptions_path in restored_paths and journal_path not in restored_paths and os.path.exists(journal_path):
+            os.remove(journal_path)
+        if self.reload_storage is not None and (subscriptions_path in restored_paths or journal_path in restored_paths):
+            self.reload_storage()
         return restored
 
     def restore_backup_bytes(self, content_bytes: bytes) -> list[str]:
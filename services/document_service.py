@@ -90,7 +90,7 @@ class DocumentService:
         return result
 
     async def analyze_node_text(self, *, text: str) -> dict | None:
-        nodes = FileHandler.parse_txt_file(text.encode("utf-8"))
+        nodes = FileHandler.parse_txt_text(text)
         if not nodes:
             return None
 
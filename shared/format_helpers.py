@@ -2,25 +2,47 @@
 from __future__ import annotations
 
 
+import calendar
+import functools
+import time
 from datetime import datetime
 
+# Regional-indicator flag emoji for every ISO-3166 alpha-2 shaped code (AA..ZZ),
+# built once so flag rendering is a single dict lookup.
+_REGIONAL_INDICATOR_OFFSET = 0x1F1E6 - ord("A")
+FLAG_EMOJI_BY_CODE = {
+    first + second: chr(ord(first) + _REGIONAL_INDICATOR_OFFSET) + chr(ord(second) + _REGIONAL_INDICATOR_OFFSET)
+    for first in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    for second in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+}
+
+
+# 2**-30 is exact, so multiplying gives the same float as dividing by 1024**3.
+_INV_GB = 1.0 / (1024**3)
+
 
 def bytes_to_gb(bytes_value):
     if bytes_value is None:
         return 0
-    return bytes_value / (1024**3)
+    return bytes_value * _INV_GB
+
+
+_TRAFFIC_UNITS = ("B", "KB", "MB", "GB", "TB")
+_TRAFFIC_UNIT_SCALES = tuple(1024.0**power for power in range(len(_TRAFFIC_UNITS)))
+# Magnitudes at or beyond this are all shown in the largest unit (also keeps inf out of int()).
+_TRAFFIC_MAGNITUDE_CAP = 1024.0 ** len(_TRAFFIC_UNITS)
 
 
 def format_traffic(bytes_value):
     if bytes_value is None or bytes_value == 0:
         return "0 B"
-    units = ["B", "KB", "MB", "GB", "TB"]
-    unit_index = 0
     size = float(bytes_value)
-    while size >= 1024 and unit_index < len(units) - 1:
-        size /= 1024
-        unit_index += 1
-    return f"{size:.2f} {units[unit_index]}"
+    unit_index = 0
+    if size >= 1024:
+        # floor(log1024(size)) straight from the integer's bit length.
+        magnitude = int(min(size, _TRAFFIC_MAGNITUDE_CAP))
+        unit_index = min((magnitude.bit_length() - 1) // 10, len(_TRAFFIC_UNITS) - 1)
+    return f"{size / _TRAFFIC_UNIT_SCALES[unit_index]:.2f} {_TRAFFIC_UNITS[unit_index]}"
 
 
 def create_progress_bar(percent, length=10):
@@ -31,105 +53,119 @@ def create_progress_bar(percent, length=10):
     filled_length = int(length * percent / 100)
     if percent > 0 and filled_length == 0:
         filled_length = 1
-    bar = "■" * filled_length + "□" * (length - filled_length)
-    return f"[{bar}]"
+    return _progress_bars(length)[filled_length]
 
 
-def get_country_flag(country_name):
-    def _code_to_flag(alpha2: str) -> str:
-        if len(alpha2) != 2 or not alpha2.isascii() or not alpha2.isalpha():
-            return "🏳️"
-        return "".join(chr(ord(ch) + 127397) for ch in alpha2.upper())
+@functools.lru_cache(maxsize=8)
+def _progress_bars(length):
+    """Every rendering of a ``length``-cell bar, indexed by the number of filled cells."""
+    return tuple(f"[{'■' * filled}{'□' * (length - filled)}]" for filled in range(length + 1))
+
+
+_UNKNOWN_FLAG = "🏳️"
+_COUNTRY_ALIASES = {
+    "香港": "HK",
+    "hongkong": "HK",
+    "hongkongsar": "HK",
+    "hk": "HK",
+    "taiwan": "TW",
+    "台湾": "TW",
+    "japan": "JP",
+    "日本": "JP",
+    "unitedstates": "US",
+    "unitedstatesofamerica": "US",
+    "usa": "US",
+    "us": "US",
+    "america": "US",
+    "美国": "US",
+    "singapore": "SG",
+    "新加坡": "SG",
+    "southkorea": "KR",
+    "republicofkorea": "KR",
+    "korea": "KR",
+    "韩国": "KR",
+    "china": "CN",
+    "中国": "CN",
+    "uk": "GB",
+    "unitedkingdom": "GB",
+    "britain": "GB",
+    "greatbritain": "GB",
+    "england": "GB",
+    "英国": "GB",
+    "germany": "DE",
+    "德国": "DE",
+    "france": "FR",
+    "法国": "FR",
+    "canada": "CA",
+    "加拿大": "CA",
+    "australia": "AU",
+    "澳大利亚": "AU",
+    "russia": "RU",
+    "俄罗斯": "RU",
+    "india": "IN",
+    "印度": "IN",
+    "netherlands": "NL",
+    "荷兰": "NL",
+    "turkey": "TR",
+    "turkiye": "TR",
+    "土耳其": "TR",
+    "brazil": "BR",
+    "巴西": "BR",
+    "vietnam": "VN",
+    "越南": "VN",
+    "thailand": "TH",
+    "泰国": "TH",
+    "philippines": "PH",
+    "菲律宾": "PH",
+    "malaysia": "MY",
+    "马来西亚": "MY",
+    "indonesia": "ID",
+    "印尼": "ID",
+    "argentina": "AR",
+    "阿根廷": "AR",
+    "mexico": "MX",
+    "墨西哥": "MX",
+}
+_GLOBAL_REGION_NAMES = ("其他", "其它", "other", "others", "unknown", "未知", "global")
+# Normalized country name -> flag emoji, resolved once at import.
+_FLAG_BY_COUNTRY_NAME = {name: FLAG_EMOJI_BY_CODE[code] for name, code in _COUNTRY_ALIASES.items()}
+_FLAG_BY_COUNTRY_NAME.update(dict.fromkeys(_GLOBAL_REGION_NAMES, "🌐"))
+_COUNTRY_NAME_NOISE = str.maketrans("", "", " -_.")
 
+
+@functools.lru_cache(maxsize=256)
+def get_country_flag(country_name):
     if country_name is None:
-        return "🏳️"
+        return _UNKNOWN_FLAG
     text = str(country_name).strip()
     if not text:
-        return "🏳️"
+        return _UNKNOWN_FLAG
 
     # Direct ISO-3166 alpha-2 code (e.g. US/CN/JP).
     if len(text) == 2 and text.isascii() and text.isalpha():
-        return _code_to_flag(text)
+        return FLAG_EMOJI_BY_CODE.get(text.upper(), _UNKNOWN_FLAG)
 
-    normalized = text.lower().replace(" ", "").replace("-", "").replace("_", "").replace(".", "")
-    aliases = {
-        "香港": "HK",
-        "hongkong": "HK",
-        "hongkongsar": "HK",
-        "hk": "HK",
-        "taiwan": "TW",
-        "台湾": "TW",
-        "japan": "JP",
-        "日本": "JP",
-        "unitedstates": "US",
-        "unitedstatesofamerica": "US",
-        "usa": "US",
-        "us": "US",
-        "america": "US",
-        "美国": "US",
-        "singapore": "SG",
-        "新加坡": "SG",
-        "southkorea": "KR",
-        "republicofkorea": "KR",
-        "korea": "KR",
-        "韩国": "KR",
-        "china": "CN",
-        "中国": "CN",
-        "uk": "GB",
-        "unitedkingdom": "GB",
-        "britain": "GB",
-        "greatbritain": "GB",
-        "england": "GB",
-        "英国": "GB",
-        "germany": "DE",
-        "德国": "DE",
-        "france": "FR",
-        "法国": "FR",
-        "canada": "CA",
-        "加拿大": "CA",
-        "australia": "AU",
-        "澳大利亚": "AU",
-        "russia": "RU",
-        "俄罗斯": "RU",
-        "india": "IN",
-        "印度": "IN",
-        "netherlands": "NL",
-        "荷兰": "NL",
-        "turkey": "TR",
-        "turkiye": "TR",
-        "土耳其": "TR",
-        "brazil": "BR",
-        "巴西": "BR",
-        "vietnam": "VN",
-        "越南": "VN",
-        "thailand": "TH",
-        "泰国": "TH",
-        "philippines": "PH",
-        "菲律宾": "PH",
-        "malaysia": "MY",
-        "马来西亚": "MY",
-        "indonesia": "ID",
-        "印尼": "ID",
-        "argentina": "AR",
-        "阿根廷": "AR",
-        "mexico": "MX",
-        "墨西哥": "MX",
-    }
-    if normalized in {"其他", "其它", "other", "others", "unknown", "未知", "global"}:
-        return "🌐"
-    code = aliases.get(normalized)
-    return _code_to_flag(code) if code else "🏳️"
+    return _FLAG_BY_COUNTRY_NAME.get(text.lower().translate(_COUNTRY_NAME_NOISE), _UNKNOWN_FLAG)
 
 
+@functools.lru_cache(maxsize=512)
+def _parse_expire_time(expire_time_str):
+    """Expire time as naive wall-clock seconds (the string's fields read as if UTC)."""
+    return calendar.timegm(datetime.strptime(expire_time_str, "%Y-%m-%d %H:%M:%S").timetuple())
+
+
+def _wall_clock_now():
+    """Local wall-clock seconds on the same scale as ``_parse_expire_time``."""
+    now = time.time()
+    return now + time.localtime(now).tm_gmtoff
+
+
 def format_remaining_time(expire_time_str, *, include_seconds: bool = True):
     try:
-        expire_date = datetime.strptime(expire_time_str, "%Y-%m-%d %H:%M:%S")
-        now = datetime.now()
-        if expire_date < now:
+        remaining = _parse_expire_time(expire_time_str) - _wall_clock_now()
+        if remaining < 0:
             return "已过期"
-        delta = expire_date - now
-        days = delta.days
-        seconds = delta.seconds
+        days, seconds = divmod(int(remaining), 86400)
         hours = seconds // 3600
         minutes = (seconds % 3600) // 60
         sec = seconds % 60
@@ -0,0 +1,52 @@
+"""JSON encode/decode helpers that prefer orjson (and ijson for streaming) when installed."""
+from __future__ import annotations
+
+import json
+from typing import Any, BinaryIO, Iterator
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional accelerator
+    ijson = None
+
+
+def json_loads(data: str | bytes | bytearray) -> Any:
+    """Parse a JSON document; raises ``ValueError`` (``json.JSONDecodeError``) on bad input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """Serialize ``obj`` to UTF-8 JSON bytes, keeping non-ASCII text unescaped.
+
+    ``indent=True`` matches ``json.dumps(..., indent=2)``; non-string dict keys are
+    stringified the same way the stdlib does.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iter_object_items(fp: BinaryIO, prefix: str) -> Iterator[tuple[str, Any]]:
+    """Yield the ``(key, value)`` pairs of the object at dotted ``prefix`` in a JSON stream.
+
+    With ijson installed the document is streamed, so only one value is materialized at a
+    time; otherwise it is parsed whole first. Yields nothing if ``prefix`` is not an object.
+    """
+    if ijson is not None:
+        yield from ijson.kvitems(fp, prefix, use_float=True)
+        return
+    node = json_loads(fp.read())
+    for key in prefix.split(".") if prefix else ():
+        node = node.get(key) if isinstance(node, dict) else None
+    if isinstance(node, dict):
+        yield from node.items()
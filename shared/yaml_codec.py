@@ -0,0 +1,18 @@
+"""YAML load helper that prefers the libyaml-backed safe loader."""
+from __future__ import annotations
+
+from typing import Any
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+YAMLError = yaml.YAMLError
+
+
+def yaml_safe_load(stream: str | bytes) -> Any:
+    """Same semantics as ``yaml.safe_load``, using the C scanner when available."""
+    return yaml.load(stream, Loader=_SafeLoader)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import unittest
+from unittest.mock import patch
 
 from core.parser import SubscriptionParser
 
@@ -111,6 +112,16 @@ vmess://example
         )
         self.assertEqual(name, "BlueWave")
 
+    def test_decisive_header_name_skips_node_scan(self) -> None:
+        headers = {
+            "profile-title": "TigerCloud",
+            "content-disposition": "attachment; filename*=UTF-8''TigerCloud.yaml",
+        }
+        nodes = [{"name": f"BlueWave-HK-{index:02d}"} for index in range(50)]
+        with patch.object(SubscriptionParser, "_extract_brand_from_nodes", side_effect=AssertionError("node scan")):
+            name = self.parser._extract_airport_name(nodes, "https://example.com/sub", headers=headers, content=None)
+        self.assertEqual(name, "TigerCloud")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,6 +7,7 @@ import unittest
 import zipfile
 from pathlib import Path
 
+from core.storage_enhanced import SubscriptionStorage
 from services.backup_service import BackupService
 
 
@@ -46,6 +47,33 @@ class BackupRestoreTest(unittest.TestCase):
         self.assertIn(os.path.normpath("data/db/subscriptions.json"), restored)
         self.assertTrue(Path("data/db/subscriptions.json").exists())
 
+    def test_restore_drops_stale_subscription_journal(self) -> None:
+        zip_path, _ = self.service.create_backup()
+        journal = Path("data/db/subscriptions.json.log")
+        journal.write_text('{"op": "del", "url": "a"}\n', encoding="utf-8")
+
+        self.service.restore_backup(zip_path)
+
+        self.assertFalse(journal.exists())
+
+    def test_restore_reloads_live_storage_and_reopens_journal(self) -> None:
+        Path("data/db/subscriptions.json").write_text(json.dumps({"https://example.com/old": {"name": "Old"}}), encoding="utf-8")
+        storage = SubscriptionStorage("data/db/subscriptions.json", journal=True)
+        service = BackupService(base_dir="data", reload_storage=storage.reload)
+        zip_path, _ = service.create_backup()
+        storage.add_or_update("https://example.com/new", {"name": "New"}, user_id=1)
+        self.assertIsNotNone(storage._journal_handle)
+
+        service.restore_backup(zip_path)
+        storage.add_or_update("https://example.com/after", {"name": "After"}, user_id=1)
+        storage.close()
+
+        self.assertNotIn("https://example.com/new", storage.subscriptions)
+        reloaded = SubscriptionStorage("data/db/subscriptions.json", journal=True)
+        self.assertIn("https://example.com/old", reloaded.subscriptions)
+        self.assertIn("https://example.com/after", reloaded.subscriptions)
+        self.assertNotIn("https://example.com/new", reloaded.subscriptions)
+
     def test_startup_bootstrap_restore_only_runs_on_empty_state(self) -> None:
         zip_path, _ = self.service.create_backup()
         bootstrap = Path("data/bootstrap_restore/latest_backup.zip")
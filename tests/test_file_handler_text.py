@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import time
+import unittest
+
+from core.file_handler import FileHandler
+
+
+class ParseTxtTextTest(unittest.TestCase):
+    def test_scans_indented_lines_and_keeps_remarks_with_spaces(self) -> None:
+        text = "# comment\n  trojan://pass@example.org:443#JP 01  \r\nnot a node\n\tss://YWVzLTI1Ni1nY206cGFzcw@1.2.3.4:8388#HK\n"
+
+        nodes = FileHandler.parse_txt_text(text)
+
+        self.assertEqual([node["protocol"] for node in nodes], ["trojan", "ss"])
+        self.assertEqual(nodes[0]["raw"], "trojan://pass@example.org:443#JP 01")
+
+    def test_limit_stops_after_enough_nodes(self) -> None:
+        text = "\n".join(f"trojan://pass@node{index}.example.org:443#N{index}" for index in range(10))
+
+        nodes = FileHandler.parse_txt_text(text, limit=3)
+
+        self.assertEqual([node["raw"][-2:] for node in nodes], ["N0", "N1", "N2"])
+
+    def test_base64_detection_handles_wrapped_payloads(self) -> None:
+        self.assertTrue(FileHandler._is_base64("  dHJvamFu\r\nOi8vcGFzcw==\n"))
+        self.assertFalse(FileHandler._is_base64("trojan://pass@example.org:443#JP"))
+        self.assertFalse(FileHandler._is_base64("dHJvamFu\nOi8vcGFzcw"))
+        self.assertFalse(FileHandler._is_base64(" \r\n "))
+
+
+    def test_base64_detection_rejects_blank_line_runs_quickly(self) -> None:
+        samples = ("\n" * 5000 + "!", "!" + "\n" * 5000, "\r\n" * 3000 + "trojan://x", "dGVz\n" * 2000 + "\n" * 2000 + "!")
+        started = time.perf_counter()
+        for sample in samples:
+            self.assertFalse(FileHandler._is_base64(sample))
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+if __name__ == "__main__":
+    unittest.main()
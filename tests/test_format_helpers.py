@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import unittest
+
+from datetime import datetime, timedelta
+
+from shared.format_helpers import create_progress_bar, format_remaining_time, format_traffic
+
+
+class FormatTrafficTest(unittest.TestCase):
+    def test_picks_unit_at_each_1024_boundary(self) -> None:
+        self.assertEqual(format_traffic(None), "0 B")
+        self.assertEqual(format_traffic(0), "0 B")
+        self.assertEqual(format_traffic(1023), "1023.00 B")
+        self.assertEqual(format_traffic(1024), "1.00 KB")
+        self.assertEqual(format_traffic(1024**2 - 1), "1024.00 KB")
+        self.assertEqual(format_traffic(1.5 * 1024**3), "1.50 GB")
+        self.assertEqual(format_traffic(1024**5), "1024.00 TB")
+
+    def test_keeps_small_negative_and_non_finite_values_in_bytes_or_tb(self) -> None:
+        self.assertEqual(format_traffic(-2048), "-2048.00 B")
+        self.assertEqual(format_traffic(0.5), "0.50 B")
+        self.assertEqual(format_traffic(float("inf")), "inf TB")
+
+
+class CreateProgressBarTest(unittest.TestCase):
+    def test_clamps_and_rounds_up_any_positive_percent(self) -> None:
+        self.assertEqual(create_progress_bar(-5), "[□□□□□□□□□□]")
+        self.assertEqual(create_progress_bar(0.5), "[■□□□□□□□□□]")
+        self.assertEqual(create_progress_bar(55, length=8), "[■■■■□□□□]")
+        self.assertEqual(create_progress_bar(250), "[■■■■■■■■■■]")
+
+
+class FormatRemainingTimeTest(unittest.TestCase):
+    def test_cached_parse_still_measures_from_current_time(self) -> None:
+        expire = (datetime.now() + timedelta(days=2, hours=3, minutes=30)).strftime("%Y-%m-%d %H:%M:%S")
+
+        self.assertEqual(format_remaining_time(expire, include_seconds=False), "2天3时")
+        self.assertEqual(format_remaining_time(expire, include_seconds=False), "2天3时")
+        self.assertEqual(format_remaining_time("2000-01-01 00:00:00"), "已过期")
+        self.assertEqual(format_remaining_time("not a date"), "")
+        self.assertEqual(format_remaining_time(None), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import shutil
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from core.geo_service import GeoLocationService
+
+
+class GeoCacheLogTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = Path("data/test_tmp/test_geo_cache")
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        self.tmpdir.mkdir(parents=True, exist_ok=True)
+        self.cache_file = self.tmpdir / "geo_cache.json"
+        self.log_file = self.tmpdir / "geo_cache.log"
+        self._patches = [
+            patch.object(GeoLocationService, "_instance", None),
+            patch.object(GeoLocationService, "_cache_file", str(self.cache_file)),
+            patch.object(GeoLocationService, "_log_file", str(self.log_file)),
+        ]
+        for item in self._patches:
+            item.start()
+
+    def tearDown(self) -> None:
+        for item in reversed(self._patches):
+            item.stop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    @staticmethod
+    def _location(country: str) -> dict:
+        return {"country": country, "city": "未知", "isp": "未知", "country_code": ""}
+
+    def test_new_entries_append_to_log_without_rewriting_snapshot(self) -> None:
+        self.cache_file.write_text(json.dumps({"1.1.1.1": self._location("美国")}), encoding="utf-8")
+        service = GeoLocationService()
+        service.cache["8.8.8.8"] = self._location("日本")
+        service._append_cache_entry("8.8.8.8", self._location("日本"))
+
+        snapshot = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        self.assertEqual(list(snapshot), ["1.1.1.1"])
+        self.assertEqual(len(self.log_file.read_text(encoding="utf-8").splitlines()), 1)
+
+        service._maybe_persist_cache(force=True)
+        self.assertFalse(self.log_file.exists())
+        snapshot = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        self.assertEqual(set(snapshot), {"1.1.1.1", "8.8.8.8"})
+
+    def test_load_replays_log_and_skips_torn_lines(self) -> None:
+        now = int(time.time())
+        self.cache_file.write_text(json.dumps({"1.1.1.1": dict(self._location("美国"), ts=now)}), encoding="utf-8")
+        self.log_file.write_text(
+            json.dumps({"8.8.8.8": dict(self._location("日本"), ts=now)}, ensure_ascii=False) + "\n" + '{"9.9.9.9": {"coun',
+            encoding="utf-8",
+        )
+        service = GeoLocationService()
+
+        self.assertEqual(set(service.cache), {"1.1.1.1", "8.8.8.8"})
+        self.assertEqual(service._log_entries, 1)
+        service._maybe_persist_cache(force=True)
+
+    def test_load_drops_entries_older_than_ttl(self) -> None:
+        stale = dict(self._location("美国"), ts=int(time.time()) - GeoLocationService._entry_ttl_seconds - 60)
+        fresh = dict(self._location("日本"), ts=int(time.time()))
+        self.cache_file.write_text(json.dumps({"1.1.1.1": stale, "8.8.8.8": fresh}), encoding="utf-8")
+
+        service = GeoLocationService()
+
+        self.assertEqual(set(service.cache), {"8.8.8.8"})
+        snapshot = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        self.assertEqual(set(snapshot), {"8.8.8.8"})
+
+    def test_legacy_entry_timestamp_is_persisted_once(self) -> None:
+        self.cache_file.write_text(json.dumps({"1.1.1.1": self._location("美国")}), encoding="utf-8")
+        first = GeoLocationService()
+        first_ts = first.cache["1.1.1.1"]["ts"]
+
+        with patch.object(GeoLocationService, "_instance", None), patch(
+            "core.geo_service.time.time", return_value=first_ts + 3600
+        ):
+            second = GeoLocationService()
+
+        self.assertEqual(second.cache["1.1.1.1"]["ts"], first_ts)
+        snapshot = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        self.assertEqual(snapshot["1.1.1.1"]["ts"], first_ts)
+
+    def test_compacts_once_log_outgrows_snapshot(self) -> None:
+        service = GeoLocationService()
+        for index in range(GeoLocationService._compact_min_entries):
+            ip = f"10.0.0.{index}"
+            service.cache[ip] = self._location("香港")
+            service._append_cache_entry(ip, self._location("香港"))
+
+        self.assertFalse(self.log_file.exists())
+        self.assertEqual(service._snapshot_entries, GeoLocationService._compact_min_entries)
+        self.assertEqual(service._log_entries, 0)
+
+    def test_bulk_lookup_posts_uncached_ips_in_one_batch(self) -> None:
+        service = GeoLocationService()
+        service.cache["1.1.1.1"] = self._location("美国")
+        session = _FakeBatchSession(
+            [
+                {"status": "success", "query": "8.8.8.8", "country": "日本", "countryCode": "JP"},
+                {"status": "fail", "query": "9.9.9.9", "message": "reserved range"},
+            ]
+        )
+        service.session = session
+
+        results = asyncio.run(service.get_locations_bulk(["1.1.1.1", "8.8.8.8", "9.9.9.9", "8.8.8.8"]))
+
+        self.assertEqual(session.posted, [["8.8.8.8", "9.9.9.9"]])
+        self.assertEqual(results["1.1.1.1"]["country"], "美国")
+        self.assertEqual(results["8.8.8.8"]["country_code"], "JP")
+        self.assertIsNone(results["9.9.9.9"])
+        self.assertIn("8.8.8.8", service.cache)
+        service._maybe_persist_cache(force=True)
+
+
+class _FakeBatchResponse:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    async def __aenter__(self) -> _FakeBatchResponse:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    def raise_for_status(self) -> None:
+        return None
+
+    async def json(self, loads=None) -> list:
+        return self._rows
+
+
+class _FakeBatchSession:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+        self.posted: list = []
+
+    def post(self, url: str, json=None, timeout=None) -> _FakeBatchResponse:
+        self.posted.append(list(json))
+        return _FakeBatchResponse(self._rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
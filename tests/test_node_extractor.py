@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import unittest
+
+from core.node_extractor import NodeIPExtractor
+
+
+class NodeIPExtractorValidationTest(unittest.TestCase):
+    def test_accepts_ipv4_and_ipv6_addresses(self) -> None:
+        self.assertTrue(NodeIPExtractor.is_valid_ip("103.118.41.216"))
+        self.assertTrue(NodeIPExtractor.is_valid_ip("2001:db8::1"))
+
+    def test_rejects_out_of_range_dotted_numbers(self) -> None:
+        self.assertFalse(NodeIPExtractor.is_valid_ip("999.1.1.1"))
+        self.assertFalse(NodeIPExtractor.is_valid_ip("1.2.3"))
+
+    def test_accepts_domains_and_rejects_malformed_hosts(self) -> None:
+        self.assertTrue(NodeIPExtractor.is_valid_ip("hk-01.example.com"))
+        self.assertFalse(NodeIPExtractor.is_valid_ip("bad_host.example.com"))
+        self.assertFalse(NodeIPExtractor.is_valid_ip("example.com\n"))
+        self.assertFalse(NodeIPExtractor.is_valid_ip("a" * 254))
+        self.assertFalse(NodeIPExtractor.is_valid_ip(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
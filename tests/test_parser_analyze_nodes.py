@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from core.parser import SubscriptionParser
+
+
+class _FakeGeoService:
+    def __init__(self, results: dict) -> None:
+        self._results = results
+        self.requested: list[str] = []
+
+    async def get_locations_bulk(self, ips) -> dict:
+        self.requested = list(ips)
+        return {ip: self._results.get(ip) for ip in self.requested}
+
+    def get_country_flag(self, country_code: str) -> str:
+        return f"flag-{country_code}"
+
+
+class ParserAnalyzeNodesTest(unittest.IsolatedAsyncioTestCase):
+    async def test_geo_lookup_covers_first_nodes_and_falls_back_to_keywords(self) -> None:
+        nodes = [
+            {"name": "东京 01", "protocol": "trojan", "server": "1.1.1.1"},
+            {"name": "香港 02", "protocol": "vmess", "server": "bad host"},
+            {"name": "HK 03", "protocol": "trojan", "server": "2.2.2.2"},
+            {"name": "US 04", "protocol": "ss", "server": "3.3.3.3"},
+        ]
+        geo = _FakeGeoService(
+            {
+                "1.1.1.1": {"country": "日本", "city": "东京", "isp": "ISP", "country_code": "JP"},
+                "2.2.2.2": None,
+            }
+        )
+        parser = SubscriptionParser()
+        parser._geo_service = geo
+
+        with patch("app.config.ENABLE_GEO_LOOKUP", True), patch("app.config.MAX_GEO_QUERIES", 2):
+            stats = await parser._analyze_nodes(nodes)
+
+        self.assertEqual(geo.requested, ["1.1.1.1", "2.2.2.2"])
+        self.assertEqual(stats["protocols"], {"trojan": 2, "vmess": 1, "ss": 1})
+        self.assertEqual(stats["countries"], {"日本": 1, "香港": 2, "美国": 1})
+        self.assertEqual(list(stats["countries"]), ["香港", "日本", "美国"])
+        self.assertEqual(list(stats["protocols"]), ["trojan", "vmess", "ss"])
+        self.assertEqual(stats["locations"][0]["flag"], "flag-JP")
+        self.assertEqual(stats["locations"][1]["city"], "未知")
+
+
+if __name__ == "__main__":
+    unittest.main()
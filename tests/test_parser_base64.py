@@ -65,6 +65,11 @@ class ParserBase64Test(unittest.TestCase):
         self.assertNotIn("base64-decoded", notes)
         self.assertIn("unrecognized-content", notes)
 
+    def test_sanitize_rejects_noisy_head_before_scanning_body(self) -> None:
+        content = "<div></div>\n" * 30 + "A" * 4096
+
+        self.assertEqual(self.parser._sanitize_base64_candidate(content), "")
+
     def test_parse_nodes_supports_urlsafe_missing_padding_and_noise(self) -> None:
         raw_text = "vmess://eyJwcyI6IkhLMDEifQ==\nss://YWVzLTI1Ni1nY206cGFzc0BleGFtcGxlLmNvbTo0NDM=#HK"
         encoded = base64.urlsafe_b64encode(raw_text.encode("utf-8")).decode("ascii").rstrip("=")
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import unittest
+
+from core.parser import SubscriptionParser
+
+
+class CountryKeywordMatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parser = SubscriptionParser()
+
+    def test_matches_chinese_and_latin_keywords(self) -> None:
+        self.assertEqual(self.parser._match_country_by_keyword("🇭🇰 香港 01"), "香港")
+        self.assertEqual(self.parser._match_country_by_keyword("Japan Tokyo 02"), "日本")
+        self.assertEqual(self.parser._match_country_by_keyword("剩余流量 10GB"), "其他")
+
+    def test_earlier_country_wins_regardless_of_position(self) -> None:
+        self.assertEqual(self.parser._match_country_by_keyword("US 中转 HK"), "香港")
+        self.assertEqual(self.parser._match_country_by_keyword("USG-01"), "美国")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import unittest
+from unittest.mock import patch
 
 from core.parser import SubscriptionParser
 
@@ -11,9 +13,12 @@ class _FakeResponse:
         self._body = body.encode("utf-8")
         self.headers = headers or {}
         self.charset = charset
+        self.content_length = len(self._body)
+        self.content = self
 
-    async def read(self) -> bytes:
-        return self._body
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self._body), size):
+            yield self._body[start : start + size]
 
     async def __aenter__(self):
         return self
@@ -26,11 +31,13 @@ class _FakeSession:
     def __init__(self, responses: list[_FakeResponse]):
         self._responses = list(responses)
         self.user_agents: list[str] = []
+        self.request_headers: list[dict[str, str]] = []
 
     def get(self, url, **kwargs):
         _ = url
         headers = kwargs.get("headers") or {}
         self.user_agents.append(str(headers.get("User-Agent", "")))
+        self.request_headers.append(dict(headers))
         if not self._responses:
             raise AssertionError("No fake responses left")
         return self._responses.pop(0)
@@ -75,6 +82,125 @@ class ParserDownloadFallbackTest(unittest.IsolatedAsyncioTestCase):
         self.assertIn("trojan://", text)
         self.assertEqual(session.user_agents, [ua_clash])
 
+    async def test_download_replays_cached_body_on_not_modified(self):
+        body = "trojan://password@example.org:443#JP01"
+        session = _FakeSession(
+            [
+                _FakeResponse(
+                    status=200,
+                    body=body,
+                    headers={"ETag": '"v1"', "Subscription-Userinfo": "upload=1; download=2; total=10"},
+                ),
+                _FakeResponse(status=304, body="", headers={"ETag": '"v1"', "Subscription-Userinfo": "upload=3; download=4; total=10"}),
+            ]
+        )
+        parser = SubscriptionParser(session=session)
+
+        await parser._download_subscription("https://example.com/sub")
+        text, headers = await parser._download_subscription("https://example.com/sub")
+
+        self.assertNotIn("If-None-Match", session.request_headers[0])
+        self.assertEqual(session.request_headers[1]["If-None-Match"], '"v1"')
+        self.assertEqual(text, body)
+        self.assertEqual(headers["subscription-userinfo"], "upload=3; download=4; total=10")
+
+    async def test_not_modified_does_not_replay_cached_traffic_info(self):
+        body = "trojan://password@example.org:443#JP01"
+        session = _FakeSession(
+            [
+                _FakeResponse(
+                    status=200,
+                    body=body,
+                    headers={"ETag": '"v1"', "Subscription-Userinfo": "upload=1; download=2; total=10"},
+                ),
+                _FakeResponse(status=304, body="", headers={"ETag": '"v1"'}),
+            ]
+        )
+        parser = SubscriptionParser(session=session)
+
+        with patch.object(SubscriptionParser, "_should_probe_traffic_headers", return_value=False):
+            await parser._download_subscription("https://example.com/sub")
+            text, headers = await parser._download_subscription("https://example.com/sub")
+
+        self.assertEqual(text, body)
+        self.assertEqual(headers["etag"], '"v1"')
+        self.assertNotIn("subscription-userinfo", headers)
+
+    def test_conditional_cache_evicts_oldest_entries_over_byte_budget(self):
+        body = "x" * 1000
+        parser = SubscriptionParser(conditional_cache_max_bytes=2500)
+
+        for index in range(3):
+            parser._remember_conditional_response(f"https://example.com/{index}", "ua", {"etag": '"v1"'}, body)
+
+        self.assertEqual(list(parser._conditional_cache), ["https://example.com/1", "https://example.com/2"])
+        self.assertLessEqual(parser._conditional_cache_bytes, 2500)
+
+    async def test_download_rejects_body_above_size_limit(self):
+        response = _FakeResponse(status=200, body="trojan://password@example.org:443#JP01\n" * 64)
+        response.content_length = None
+        parser = SubscriptionParser(session=_FakeSession([response]), max_body_bytes=1024)
+
+        with self.assertRaises(ValueError):
+            await parser._download_subscription("https://example.com/sub")
+
+    async def test_parser_owned_session_is_reused_across_downloads(self):
+        created: list[_FakeSession] = []
+
+        def _make_session(**kwargs):
+            _ = kwargs
+            session = _FakeSession(
+                [
+                    _FakeResponse(status=200, body="trojan://password@example.org:443#JP01"),
+                    _FakeResponse(status=200, body="trojan://password@example.org:443#JP02"),
+                ]
+            )
+            session.closed = False
+
+            async def _close():
+                session.closed = True
+
+            session.close = _close
+            created.append(session)
+            return session
+
+        with patch("core.parser.aiohttp.TCPConnector"), patch("core.parser.aiohttp.ClientSession", side_effect=_make_session):
+            async with SubscriptionParser() as parser:
+                await parser._download_subscription("https://example.com/sub")
+                await parser._download_subscription("https://example.com/sub")
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(len(created[0].user_agents), 2)
+        self.assertTrue(created[0].closed)
+        self.assertIsNone(parser.session)
+
+
+class ParserSessionLoopTest(unittest.TestCase):
+    def test_owned_session_from_previous_loop_is_closed(self):
+        created: list[_FakeSession] = []
+
+        def _make_session(**kwargs):
+            _ = kwargs
+            session = _FakeSession([_FakeResponse(status=200, body="trojan://password@example.org:443#JP01")])
+            session.closed = False
+
+            async def _close():
+                session.closed = True
+
+            session.close = _close
+            created.append(session)
+            return session
+
+        parser = SubscriptionParser()
+        with patch("core.parser.aiohttp.TCPConnector"), patch("core.parser.aiohttp.ClientSession", side_effect=_make_session):
+            asyncio.run(parser._download_subscription("https://example.com/sub"))
+            asyncio.run(parser._download_subscription("https://example.com/sub"))
+            asyncio.run(parser.close())
+
+        self.assertEqual(len(created), 2)
+        self.assertTrue(created[0].closed)
+        self.assertTrue(created[1].closed)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import shutil
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from core import parser as parser_module
+from core.parser import SubscriptionParser
+
+YAML_TEMPLATE = """
+proxies:
+  - name: {name}
+    type: trojan
+    server: example.com
+    port: 443
+    password: secret
+"""
+
+
+class ParserYamlCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = Path("data/test_tmp/test_parser_yaml_cache")
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        self.parser = SubscriptionParser(yaml_cache_dir=str(self.tmpdir), yaml_cache_max_entries=2)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_identical_yaml_payload_is_served_from_cache(self) -> None:
+        content = YAML_TEMPLATE.format(name="HK-01")
+        nodes, content_format, _, _, notes = self.parser._parse_nodes(content)
+        self.assertEqual(content_format, "yaml")
+        self.assertEqual(len(list(self.tmpdir.glob("*.json"))), 1)
+
+        with patch("core.parser.yaml_safe_load", side_effect=AssertionError("yaml re-parsed")):
+            cached_nodes, cached_format, _, _, cached_notes = self.parser._parse_nodes(content)
+
+        self.assertEqual(cached_format, "yaml")
+        self.assertEqual(cached_nodes, nodes)
+        self.assertEqual(cached_notes, notes)
+
+    def test_cache_is_bounded(self) -> None:
+        for index in range(4):
+            self.parser._parse_nodes(YAML_TEMPLATE.format(name=f"HK-{index:02d}"))
+        self.assertEqual(len(list(self.tmpdir.glob("*.json"))), 2)
+
+    def test_non_yaml_payload_bypasses_cache(self) -> None:
+        self.parser._parse_nodes("trojan://password@example.org:443#jp01")
+        self.assertEqual(list(self.tmpdir.glob("*.json")), [])
+
+
+
+class _YamlResponse:
+    status = 200
+    charset = "utf-8"
+
+    def __init__(self, body: str) -> None:
+        self._body = body.encode("utf-8")
+        self.headers = {"subscription-userinfo": "upload=1; download=2; total=10"}
+        self.content_length = len(self._body)
+        self.content = self
+
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self._body), size):
+            yield self._body[start : start + size]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _YamlSession:
+    def __init__(self, body: str) -> None:
+        self._body = body
+
+    def get(self, url, **kwargs):
+        _ = url, kwargs
+        return _YamlResponse(self._body)
+
+
+class ParserYamlParseCountTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.tmpdir = Path("data/test_tmp/test_parser_yaml_parse_count")
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    async def _parse_counting_loads(self, body: str) -> int:
+        parser = SubscriptionParser(session=_YamlSession(body), yaml_cache_dir=str(self.tmpdir))
+        with patch("core.parser.yaml_safe_load", wraps=parser_module.yaml_safe_load) as load, patch.object(
+            parser, "_analyze_nodes", AsyncMock(return_value={})
+        ):
+            result = await parser._parse_impl("https://example.com/sub")
+        self.assertEqual(result["node_count"], 1)
+        return load.call_count
+
+    async def test_downloaded_yaml_body_is_loaded_once(self) -> None:
+        body = "name: Demo Airport\n" + YAML_TEMPLATE.format(name="HK-01")
+
+        self.assertEqual(await self._parse_counting_loads(body), 1)
+        # A fresh parser hits the on-disk node cache; the probe and name detection still share one load.
+        self.assertEqual(await self._parse_counting_loads(body), 1)
+
+if __name__ == "__main__":
+    unittest.main()
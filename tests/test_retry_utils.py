@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+
+from utils.retry_utils import async_retry_on_failure
+
+
+class AsyncRetryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_backoff_delay_is_capped(self) -> None:
+        sleeps: list[float] = []
+
+        async def _fake_sleep(seconds: float) -> None:
+            sleeps.append(seconds)
+
+        @async_retry_on_failure(max_retries=5, initial_delay=4.0, backoff_factor=3.0, max_delay=10.0)
+        async def _always_fails() -> None:
+            raise aiohttp.ClientError("down")
+
+        with patch("utils.retry_utils.asyncio.sleep", _fake_sleep), patch("utils.retry_utils.random.random", return_value=0.0):
+            with self.assertRaises(aiohttp.ClientError):
+                await _always_fails()
+
+        self.assertEqual(sleeps, [4.0, 10.0, 10.0, 10.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
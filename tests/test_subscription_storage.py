@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from core.storage_enhanced import SubscriptionStorage
+from shared.json_codec import json_dumps
+
+
+class SubscriptionStorageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = Path("data/test_tmp/test_subscription_storage")
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        self.tmpdir.mkdir(parents=True, exist_ok=True)
+        self.data_file = self.tmpdir / "subscriptions.json"
+        self.storage = SubscriptionStorage(str(self.data_file))
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _load_file(self) -> dict:
+        return json.loads(self.data_file.read_text(encoding="utf-8"))
+
+    def test_batch_writes_once_on_exit(self) -> None:
+        with patch.object(self.storage, "_save_data_blocking", wraps=self.storage._save_data_blocking) as save:
+            with self.storage.batch():
+                for index in range(5):
+                    self.storage.add_or_update(f"https://example.com/{index}", {"name": f"Sub {index}"}, user_id=1)
+                self.assertEqual(save.call_count, 0)
+
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(self._load_file()), 5)
+        self.assertFalse(Path(str(self.data_file) + ".tmp").exists())
+
+    def test_bulk_update_saves_once(self) -> None:
+        items = {f"https://example.com/{index}": {"name": f"Sub {index}"} for index in range(3)}
+        with patch.object(self.storage, "_save_data_blocking", wraps=self.storage._save_data_blocking) as save:
+            self.storage.bulk_update(items, user_id=2)
+
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual({data["owner_uid"] for data in self._load_file().values()}, {2})
+
+    def test_batch_saves_even_when_body_raises(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with self.storage.batch():
+                self.storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+                raise RuntimeError("boom")
+
+        self.assertIn("https://example.com/a", self._load_file())
+
+    def test_debounced_storage_coalesces_writes(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), debounce_ms=50)
+        with patch.object(storage, "_save_data_blocking", wraps=storage._save_data_blocking) as save:
+            for index in range(5):
+                storage.add_or_update(f"https://example.com/{index}", {"name": f"Sub {index}"}, user_id=1)
+            self.assertEqual(save.call_count, 0)
+            self.assertFalse(self.data_file.exists())
+
+            time.sleep(0.3)
+
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(self._load_file()), 5)
+
+    def test_debounced_save_is_not_postponed_past_max_delay(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), debounce_ms=100)
+        with patch.object(SubscriptionStorage, "SAVE_MAX_DELAY_SECONDS", 0.3):
+            with patch.object(storage, "_save_data_blocking", wraps=storage._save_data_blocking) as save:
+                started = time.monotonic()
+                index = 0
+                while save.call_count == 0 and time.monotonic() - started < 2.0:
+                    storage.add_or_update(f"https://example.com/{index}", {"name": f"Sub {index}"}, user_id=1)
+                    index += 1
+                    time.sleep(0.02)
+                elapsed = time.monotonic() - started
+        storage.close()
+
+        self.assertGreaterEqual(save.call_count, 1)
+        self.assertLess(elapsed, 1.0)
+
+    def test_flush_writes_pending_debounced_changes(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), debounce_ms=60_000)
+        storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+
+        self.assertTrue(storage.flush())
+        self.assertIn("https://example.com/a", self._load_file())
+        self.assertFalse(storage._dirty)
+
+    def test_flush_async_keeps_changes_made_during_the_write_dirty(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), debounce_ms=60_000)
+        storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+        original_save = storage._save_data_blocking
+
+        def _save_with_concurrent_mutation() -> bool:
+            self.assertTrue(storage._save_lock.locked())
+            storage.add_or_update("https://example.com/b", {"name": "B"}, user_id=1)
+            return original_save()
+
+        with patch.object(storage, "_save_data_blocking", side_effect=_save_with_concurrent_mutation):
+            self.assertTrue(asyncio.run(storage.flush_async()))
+
+        self.assertTrue(storage._dirty)
+        storage.close()
+        self.assertIn("https://example.com/b", self._load_file())
+
+    def test_close_persists_pending_changes_and_stops_writer(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), debounce_ms=60_000)
+        storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+        self.assertTrue(storage._writer.is_alive())
+
+        storage.close()
+
+        self.assertFalse(storage._writer.is_alive())
+        self.assertIn("https://example.com/a", self._load_file())
+
+    def test_mutations_after_close_are_saved_synchronously(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), debounce_ms=60_000)
+        storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+        storage.close()
+
+        storage.add_or_update("https://example.com/b", {"name": "B"}, user_id=1)
+
+        self.assertIn("https://example.com/b", self._load_file())
+        self.assertFalse(storage._dirty)
+
+    def test_journal_is_unlinked_while_appends_are_locked_out(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), journal=True)
+        storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+        lock_held: list[bool] = []
+        real_remove = os.remove
+
+        def _remove(path):
+            lock_held.append(storage._lock.locked())
+            real_remove(path)
+
+        with patch("core.storage_enhanced.os.remove", side_effect=_remove):
+            storage.flush()
+
+        self.assertEqual(lock_held, [True])
+        self.assertFalse(Path(storage.journal_file).exists())
+
+    def test_journal_appends_mutations_and_replays_on_load(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), journal=True)
+        storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+        storage.add_or_update("https://example.com/b", {"name": "B"}, user_id=1)
+        storage.add_tag("https://example.com/a", "vip")
+        storage.remove("https://example.com/b")
+
+        self.assertFalse(self.data_file.exists())
+        journal_lines = Path(storage.journal_file).read_bytes().splitlines()
+        self.assertEqual(len(journal_lines), 4)
+
+        with open(storage.journal_file, "ab") as handle:
+            handle.write(b'{"op": "set", "url": "https://exa')
+        reloaded = SubscriptionStorage(str(self.data_file), journal=True)
+        self.assertEqual(list(reloaded.subscriptions), ["https://example.com/a"])
+        self.assertEqual(reloaded.subscriptions["https://example.com/a"]["tags"], ["vip"])
+
+        self.assertTrue(reloaded.flush())
+        self.assertFalse(Path(storage.journal_file).exists())
+        self.assertEqual(list(self._load_file()), ["https://example.com/a"])
+
+    def test_journal_compacts_into_snapshot(self) -> None:
+        storage = SubscriptionStorage(str(self.data_file), journal=True)
+        for index in range(SubscriptionStorage.JOURNAL_COMPACT_MIN_ENTRIES):
+            storage.add_or_update(f"https://example.com/{index}", {"name": f"Sub {index}"}, user_id=1)
+
+        self.assertFalse(Path(storage.journal_file).exists())
+        self.assertEqual(len(self._load_file()), SubscriptionStorage.JOURNAL_COMPACT_MIN_ENTRIES)
+
+    def test_saved_file_keeps_unicode_and_reloads(self) -> None:
+        self.storage.add_or_update("https://example.com/a", {"name": "香港机场", "node_count": 3}, user_id=7)
+
+        saved_text = self.data_file.read_text(encoding="utf-8")
+        self.assertIn("香港机场", saved_text)
+        self.assertNotIn("\n", saved_text)
+        reloaded = SubscriptionStorage(str(self.data_file))
+        self.assertEqual(reloaded.subscriptions["https://example.com/a"]["name"], "香港机场")
+        self.assertEqual(reloaded.subscriptions["https://example.com/a"]["owner_uid"], 7)
+
+    def test_export_and_import_round_trip(self) -> None:
+        self.storage.add_or_update("https://example.com/a", {"name": "日本机场"}, user_id=1)
+        export_file = self.tmpdir / "export.json"
+
+        self.assertTrue(self.storage.export_to_file(str(export_file)))
+        exported = json.loads(export_file.read_text(encoding="utf-8"))
+        self.assertEqual(exported["count"], 1)
+
+        target = SubscriptionStorage(str(self.tmpdir / "other.json"))
+        self.assertEqual(target.import_from_file(str(export_file)), 1)
+        self.assertEqual(target.subscriptions["https://example.com/a"]["name"], "日本机场")
+
+    def test_tag_index_tracks_mutations_and_reload(self) -> None:
+        self.storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+        self.storage.add_or_update("https://example.com/b", {"name": "B"}, user_id=1)
+        self.storage.add_tag("https://example.com/a", "hk")
+        self.storage.add_tag("https://example.com/b", "hk")
+        self.storage.add_tag("https://example.com/b", "jp")
+        self.assertFalse(self.storage.add_tag("https://example.com/b", "jp"))
+
+        self.assertEqual(set(self.storage.get_by_tag("hk")), {"https://example.com/a", "https://example.com/b"})
+        self.assertEqual(self.storage.get_all_tags(), ["hk", "jp"])
+
+        self.storage.remove_tag("https://example.com/b", "jp")
+        self.storage.remove("https://example.com/a")
+        self.assertEqual(list(self.storage.get_by_tag("hk")), ["https://example.com/b"])
+        self.assertEqual(self.storage.get_all_tags(), ["hk"])
+
+        reloaded = SubscriptionStorage(str(self.data_file))
+        self.assertEqual(list(reloaded.get_by_tag("hk")), ["https://example.com/b"])
+        self.assertEqual(reloaded.get_by_tag("jp"), {})
+
+    def test_statistics_follow_running_totals(self) -> None:
+        self.storage.add_or_update(
+            "https://example.com/a", {"name": "A", "total": 100, "remaining": 40, "expire_time": "2000-01-01 00:00:00"}
+        )
+        self.storage.add_or_update("https://example.com/b", {"name": "B", "total": 50, "remaining": 50})
+        self.assertEqual(self.storage.get_statistics()["expired"], 1)
+
+        self.storage.add_or_update("https://example.com/a", {"name": "A", "total": 200, "remaining": 150})
+        self.storage.remove("https://example.com/b")
+        stats = self.storage.get_statistics()
+
+        self.assertEqual(stats, self.storage._calc_statistics(self.storage.get_all()))
+        self.assertEqual(stats["total_traffic"], 200)
+        self.assertEqual(stats["total_remaining"], 150)
+        self.assertEqual(stats["expired"], 0)
+
+    def test_legacy_records_get_expire_ts_on_load(self) -> None:
+        self.data_file.write_text(
+            json.dumps(
+                {
+                    "https://example.com/old": {"name": "Old", "expire_time": "2000-01-01 00:00:00"},
+                    "https://example.com/bad": {"name": "Bad", "expire_time": "soon"},
+                }
+            ),
+            encoding="utf-8",
+        )
+        storage = SubscriptionStorage(str(self.data_file))
+
+        self.assertIsInstance(storage.subscriptions["https://example.com/old"]["expire_ts"], float)
+        self.assertIsNone(storage.subscriptions["https://example.com/bad"]["expire_ts"])
+        self.assertEqual(storage.get_statistics()["expired"], 1)
+
+    def test_unchanged_refresh_skips_save(self) -> None:
+        info = {"name": "A", "total": 100, "remaining": 40}
+        self.storage.add_or_update("https://example.com/a", info, user_id=1)
+        self.storage.add_or_update("https://example.com/a", info, user_id=1)
+
+        with patch.object(self.storage, "_save_data_blocking", wraps=self.storage._save_data_blocking) as save:
+            self.storage.add_or_update("https://example.com/a", info, user_id=1)
+            self.assertEqual(save.call_count, 0)
+            self.storage.add_or_update("https://example.com/a", {**info, "remaining": 30}, user_id=1)
+            self.assertEqual(save.call_count, 1)
+
+        self.assertEqual(self._load_file()["https://example.com/a"]["remaining"], 30)
+
+    def test_import_without_subscriptions_keeps_store(self) -> None:
+        self.storage.add_or_update("https://example.com/a", {"name": "A"}, user_id=1)
+        bad_file = self.tmpdir / "bad.json"
+        bad_file.write_text(json.dumps({"version": "1.0", "count": 0}), encoding="utf-8")
+
+        self.assertEqual(self.storage.import_from_file(str(bad_file), merge=False), 0)
+        self.assertIn("https://example.com/a", self.storage.subscriptions)
+
+    def test_streamed_export_matches_whole_document_dump(self) -> None:
+        for index in range(3):
+            self.storage.add_or_update(f"https://example.com/{index}", {"name": "香港", "total": 1.5}, user_id=1)
+        self.storage.add_tag("https://example.com/1", "hk")
+        export_file = self.tmpdir / "export.json"
+
+        with patch("core.storage_enhanced._now_text", return_value="2026-01-01 00:00:00"):
+            self.assertTrue(self.storage.export_to_file(str(export_file)))
+
+        expected = json_dumps(
+            {
+                "version": "1.0",
+                "exported_at": "2026-01-01 00:00:00",
+                "count": 3,
+                "subscriptions": self.storage.subscriptions,
+            },
+            indent=True,
+        )
+        self.assertEqual(export_file.read_bytes(), expected)
+
+    def test_large_export_is_written_compactly(self) -> None:
+        for index in range(3):
+            self.storage.add_or_update(f"https://example.com/{index}", {"name": "香港"}, user_id=1)
+        export_file = self.tmpdir / "export.json"
+
+        with patch.object(SubscriptionStorage, "EXPORT_INDENT_MAX_SUBSCRIPTIONS", 2), patch(
+            "core.storage_enhanced._now_text", return_value="2026-01-01 00:00:00"
+        ):
+            self.assertTrue(self.storage.export_to_file(str(export_file)))
+
+        expected = json_dumps(
+            {
+                "version": "1.0",
+                "exported_at": "2026-01-01 00:00:00",
+                "count": 3,
+                "subscriptions": self.storage.subscriptions,
+            }
+        )
+        self.assertEqual(export_file.read_bytes(), expected)
+        self.assertEqual(self.storage.import_from_file(str(export_file)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,6 +22,7 @@ def async_retry_on_failure(
     initial_delay: float = 1.0,
     backoff_factor: float = 2.0,
     exceptions: tuple = (aiohttp.ClientError, asyncio.TimeoutError),
+    max_delay: float = 30.0,
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """
     异步重试装饰器（指数退避 + 随机抖动）。
@@ -31,12 +32,13 @@ def async_retry_on_failure(
         initial_delay: 初始重试等待时间（秒）。
         backoff_factor: 每次重试后的退避倍率。
         exceptions: 触发重试的异常类型。
+        max_delay: 单次等待的上限（秒），抖动叠加在上限之上。
     """
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
-            delay = initial_delay
+            delay = min(initial_delay, max_delay)
             last_exception: Optional[Exception] = None
 
             for attempt in range(1, max_retries + 1):
@@ -71,7 +73,7 @@ def async_retry_on_failure(
                     )
                     jitter = delay * 0.25 * random.random()
                     await asyncio.sleep(delay + jitter)
-                    delay *= backoff_factor
+                    delay = min(delay * backoff_factor, max_delay)
 
             if last_exception:
                 raise last_exception
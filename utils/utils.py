@@ -7,7 +7,7 @@ from __future__ import annotations
 
 
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 from typing import Literal
 
 from renderers.formatters import format_subscription_info
@@ -19,14 +19,23 @@ from shared.format_helpers import (
     get_country_flag,
 )
 
+# 常见的规范 http(s) URL：主机部分只含 RFC 3986 authority 字符，urlsplit 必然给出同样结论
+_PLAIN_HTTP_URL_RE = re.compile(r"https?://[A-Za-z0-9\-._~%!$&'()*+,;=:@]+(?=[/?#]|\Z)", re.IGNORECASE)
+
 
 def is_valid_url(url):
     """验证 URL 是否有效。"""
+    if not isinstance(url, str):
+        return False
+    if _PLAIN_HTTP_URL_RE.match(url):
+        return True
+    # 前导空白、控制字符、IPv6 字面量等少见写法交给 urlsplit 判定（无需 urlparse 的 params 解析）
     try:
-        result = urlparse(url)
-        return result.scheme in ("http", "https") and bool(result.netloc)
-    except Exception:
+        result = urlsplit(url)
+    except ValueError:
+        # 如未闭合的 IPv6 方括号
         return False
+    return result.scheme in ("http", "https") and bool(result.netloc)
 
 
 class InputDetector:
@@ -49,12 +58,12 @@ class InputDetector:
         if not text.startswith(("http://", "https://")):
             return False
         url_pattern = r"^https?://[^\s]+$"
-        lines = text.split("\n")
-        return all(re.match(url_pattern, line.strip()) for line in lines if line.strip())
+        stripped_lines = (line.strip() for line in text.splitlines())
+        return all(re.match(url_pattern, line) for line in stripped_lines if line)
 
     @staticmethod
     def is_node_text(text: str) -> bool:
-        protocols = [
+        protocols = (
             "vmess://",
             "vless://",
             "ss://",
@@ -62,12 +71,19 @@ class InputDetector:
             "trojan://",
             "hysteria://",
             "hysteria2://",
-        ]
-        lines = [line.strip() for line in text.split("\n") if line.strip()]
-        if not lines:
+        )
+        line_count = 0
+        node_count = 0
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            line_count += 1
+            if line.startswith(protocols):
+                node_count += 1
+        if not line_count:
             return False
-        node_count = sum(1 for line in lines if any(line.startswith(p) for p in protocols))
-        return node_count >= len(lines) * 0.5
+        return node_count >= line_count * 0.5
 
     @staticmethod
     def detect_file_type(filename: str) -> Literal["txt", "yaml", "json", "unknown"]: